@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Response sizes and server-side cost of each available Content-Encoding.
+
+Fetches the static catalogs (precompressed at startup) and a page of
+custom lists (compressed per request) through the in-process app with every
+encoding the server supports, and reports bytes on the wire plus latency.
+
+    python -m benchmarks.bench_compression --lists 100 --requests 500
+"""
+import argparse
+import asyncio
+import os
+
+from benchmarks.common import app_lifespan, asgi_request, summarize
+
+os.environ["STORAGE_BACKEND"] = "memory"
+from compression import PREFERENCE
+import server
+
+FOODS = ["Pizza 🍕", "Burger 🍔", "Sushi 🍣", "Tacos 🌮", "Pasta 🍝", "Salad 🥗"]
+PATHS = [
+    ("premade-lists", "/api/premade-lists", None),
+    ("themes", "/api/themes", None),
+    ("custom-lists page", "/api/custom-lists", {"limit": 100}),
+]
+
+
+async def measure(path: str, query, encoding: str, requests: int) -> tuple:
+    headers = {"accept-encoding": encoding}
+    latencies = []
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for _ in range(requests):
+        t0 = loop.time()
+        status, response_headers, body = await asgi_request(server.app, "GET", path, query=query, headers=headers)
+        latencies.append(loop.time() - t0)
+        assert status == 200, status
+    return len(body), response_headers.get("content-encoding", "identity"), summarize(latencies, loop.time() - start)
+
+
+async def main(args) -> None:
+    async with app_lifespan(server.app):
+        for n in range(args.lists):
+            await asgi_request(server.app, "POST", "/api/custom-lists",
+                               json_body=FOODS[n % 3:] + [f"Special {n}"], query={"name": f"bench {n}"})
+        for label, path, query in PATHS:
+            identity = None
+            for encoding in ["identity"] + PREFERENCE:
+                size, used, stats = await measure(path, query, encoding, args.requests)
+                identity = identity or size
+                print(f"{label:<20} {used:<9} {size:>8,} B {size / identity:>7.1%}"
+                      f"  p50 {stats['p50_ms']:>6.2f} ms  p99 {stats['p99_ms']:>6.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--lists", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=500)
+    asyncio.run(main(parser.parse_args()))
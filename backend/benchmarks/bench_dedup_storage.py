@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""
+How much smaller custom_lists gets with content-addressed, interned storage.
+
+Simulates --submissions list creations drawn (with a popularity skew) from
+--distinct different lists of premade catalog items, then compares:
+
+  legacy    one document per submission, uuid4 id, item names inline
+  dedup     one document per distinct content (content_id), item_refs into
+            the food_items dictionary (counted too)
+
+Sizes are the raw BSON bytes of the documents. With --mongo both layouts
+are also written to scratch databases on MONGO_URL and collStats (data,
+storage and index sizes) is reported; the databases are dropped afterwards.
+
+    python -m benchmarks.bench_dedup_storage --submissions 100000 --distinct 2000 --mongo
+"""
+import argparse
+import asyncio
+import os
+import random
+import uuid
+from datetime import datetime, timedelta
+
+import bson
+
+from benchmarks.common import Timer
+
+from repository import CustomListRepository, content_id, item_ref
+from server import PREMADE_LISTS
+
+CATALOG = sorted({item for premade in PREMADE_LISTS.values() for item in premade["items"]})
+
+
+def submissions(count: int, distinct: int, seed: int = 0) -> list:
+    rng = random.Random(seed)
+    lists = [
+        (f"List {n % 50}", rng.sample(CATALOG, rng.randint(4, 10)))
+        for n in range(distinct)
+    ]
+    # Popular lists get resubmitted far more often than the long tail.
+    popularity = [1 / (rank + 1) for rank in range(distinct)]
+    start = datetime(2024, 1, 1)
+    return [
+        {"name": name, "items": items, "created_at": str(start + timedelta(seconds=n))}
+        for n, (name, items) in enumerate(rng.choices(lists, weights=popularity, k=count))
+    ]
+
+
+def legacy_docs(subs: list) -> list:
+    return [{"id": str(uuid.uuid4()), **sub} for sub in subs]
+
+
+def dedup_docs(subs: list) -> tuple:
+    lists, dictionary = {}, {}
+    for sub in subs:
+        list_id = content_id(sub["name"], sub["items"])
+        if list_id in lists:
+            continue
+        refs = []
+        for item in sub["items"]:
+            ref = item_ref(item)
+            dictionary[ref] = {"_id": ref, "name": item}
+            refs.append(ref)
+        lists[list_id] = {"id": list_id, "name": sub["name"], "created_at": sub["created_at"],
+                          "item_refs": refs}
+    return list(lists.values()), list(dictionary.values())
+
+
+def bson_size(docs: list) -> int:
+    return sum(len(bson.encode(doc)) for doc in docs)
+
+
+def report(label: str, count: int, size: int, baseline: int) -> None:
+    print(f"{label:<34} {count:>9,} docs {size / 1e6:>9.2f} MB  {size / baseline:>6.1%}")
+
+
+async def coll_stats(db, name: str) -> dict:
+    stats = await db.command("collStats", name)
+    return {key: stats.get(key, 0) for key in ("count", "size", "storageSize", "totalIndexSize")}
+
+
+async def mongo_sizes(args, subs: list) -> None:
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv()
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL"))
+    legacy_db, dedup_db = client[f"{args.database}_legacy"], client[f"{args.database}_dedup"]
+    try:
+        legacy = CustomListRepository(legacy_db)
+        await legacy.ensure_indexes()
+        docs = legacy_docs(subs)
+        for i in range(0, len(docs), 5000):
+            await legacy.collection.insert_many(docs[i:i + 5000], ordered=False)
+
+        dedup = CustomListRepository(dedup_db)
+        await dedup.ensure_indexes()
+        with Timer() as timer:
+            for i in range(0, len(subs), 1000):
+                batch = [{"id": content_id(sub["name"], sub["items"]), **sub} for sub in subs[i:i + 1000]]
+                await dedup.upsert_many(batch)
+        print(f"dedup upserts: {len(subs) / timer.elapsed:,.0f} submissions/s")
+
+        before = await coll_stats(legacy_db, "custom_lists")
+        after = await coll_stats(dedup_db, "custom_lists")
+        dictionary = await coll_stats(dedup_db, "food_items")
+        print(f"{'collStats':<24} {'count':>10} {'size':>12} {'storage':>12} {'indexes':>12}")
+        for label, stats in (("legacy custom_lists", before), ("dedup custom_lists", after),
+                             ("dedup food_items", dictionary)):
+            print(f"{label:<24} {stats['count']:>10,} {stats['size']:>12,} "
+                  f"{stats['storageSize']:>12,} {stats['totalIndexSize']:>12,}")
+        total = lambda stats: stats["storageSize"] + stats["totalIndexSize"]
+        print(f"on-disk shrink: {1 - (total(after) + total(dictionary)) / total(before):.1%}")
+    finally:
+        await client.drop_database(legacy_db.name)
+        await client.drop_database(dedup_db.name)
+        client.close()
+
+
+def main(args) -> None:
+    subs = submissions(args.submissions, args.distinct)
+    legacy = legacy_docs(subs)
+    lists, dictionary = dedup_docs(subs)
+    baseline = bson_size(legacy)
+    report("legacy custom_lists", len(legacy), baseline, baseline)
+    report("dedup custom_lists", len(lists), bson_size(lists), baseline)
+    report("dedup food_items", len(dictionary), bson_size(dictionary), baseline)
+    total = bson_size(lists) + bson_size(dictionary)
+    print(f"BSON shrink: {1 - total / baseline:.1%}")
+    if args.mongo:
+        asyncio.run(mongo_sizes(args, subs))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--submissions", type=int, default=100_000)
+    parser.add_argument("--distinct", type=int, default=2000)
+    parser.add_argument("--mongo", action="store_true", help="also measure collStats on MONGO_URL")
+    parser.add_argument("--database", default="food_roulette_bench")
+    main(parser.parse_args())
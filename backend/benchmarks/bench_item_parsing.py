@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Cost of reading an item-list body: pydantic List[str] versus the lean path.
+
+For each list size, a JSON array of item names is posted through two
+minimal in-process apps with the same spin handler:
+
+  pydantic  the handler declares ``food_items: List[str]``
+  lean      the handler reads the body with server._read_items
+            (streamed size cap, one json.loads, C-level checks)
+
+The limits are raised for this part so every size is accepted. Also timed
+on their own: the two parsers without HTTP, and how fast the default
+limits turn away an oversized body, with and without Content-Length.
+
+    python -m benchmarks.bench_item_parsing --sizes 10,100,1000,10000,100000
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+from typing import List
+
+from fastapi import FastAPI, Request
+from pydantic import TypeAdapter
+
+from benchmarks.common import asgi_request, summarize
+
+os.environ["STORAGE_BACKEND"] = "memory"
+from limits import ItemLimits
+import server
+
+legacy = FastAPI()
+lean = FastAPI()
+
+
+@legacy.post("/spin")
+async def legacy_spin(food_items: List[str]):
+    return {"selected_food": random.choice(food_items), "total_options": len(food_items)}
+
+
+@lean.post("/spin")
+async def lean_spin(request: Request):
+    food_items = await server._read_items(request)
+    return {"selected_food": random.choice(food_items), "total_options": len(food_items)}
+
+
+def best_of(fn, repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+async def post(app, body: bytes, requests: int, headers=None) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        t0 = time.perf_counter()
+        status, _, _ = await asgi_request(app, "POST", "/spin", content=body,
+                                          headers=headers or {"content-type": "application/json"})
+        latencies.append(time.perf_counter() - t0)
+    stats = summarize(latencies, time.perf_counter() - start)
+    stats["status"] = status
+    return stats
+
+
+async def rejection(body: bytes, requests: int) -> None:
+    """Default limits: the oversized body, declared up front or streamed in chunks."""
+    server.item_limits = ItemLimits()
+    declared = await post(lean, body, requests)
+
+    async def chunked(scope, receive, send):
+        # The same body without Content-Length, arriving in 64 KiB chunks
+        chunks = iter([
+            {"type": "http.request", "body": body[i:i + 65536], "more_body": i + 65536 < len(body)}
+            for i in range(0, len(body), 65536)
+        ])
+
+        async def receive_chunk():
+            return next(chunks)
+        scope["headers"] = [(k, v) for k, v in scope["headers"] if k != b"content-length"]
+        await lean(scope, receive_chunk, send)
+
+    streamed = await post(chunked, b"", requests)
+    print(f"reject {len(body):,} B body: Content-Length {declared['p50_ms']:.3f} ms "
+          f"(HTTP {declared['status']}), streamed {streamed['p50_ms']:.3f} ms (HTTP {streamed['status']})")
+
+
+async def main(args) -> None:
+    adapter = TypeAdapter(List[str])
+    largest = None
+    print(f"{'items':>7} {'body':>11} {'pydantic parse':>15} {'lean parse':>11} "
+          f"{'pydantic POST p50':>18} {'lean POST p50':>14}")
+    for size in args.sizes:
+        items = [f"Food item {n}" for n in range(size)]
+        body = json.dumps(items).encode()
+        largest = body
+        server.item_limits = ItemLimits(max_body_bytes=len(body), max_items=size, max_item_length=64)
+        limits = server.item_limits
+        repeat = max(3, min(200, 200_000 // size))
+        pydantic_parse = best_of(lambda: adapter.validate_python(json.loads(body)), repeat)
+        lean_parse = best_of(lambda: limits.parse(body), repeat)
+        requests = max(3, min(200, 100_000 // size))
+        old = await post(legacy, body, requests)
+        new = await post(lean, body, requests)
+        assert old["status"] == new["status"] == 200, (old["status"], new["status"])
+        print(f"{size:>7,} {len(body):>9,} B {pydantic_parse * 1000:>12.3f} ms {lean_parse * 1000:>8.3f} ms "
+              f"{old['p50_ms']:>15.3f} ms {new['p50_ms']:>11.3f} ms")
+    await rejection(largest, 20)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")],
+                        default=[10, 100, 1000, 10_000, 100_000])
+    asyncio.run(main(parser.parse_args()))
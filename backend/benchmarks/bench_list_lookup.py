@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Custom-list point lookup latency as the collection grows, with and without
+the indexes created by CustomListRepository.ensure_indexes().
+
+Uses a scratch database (food_roulette_bench by default) on MONGO_URL and
+drops it afterwards.
+
+    python -m benchmarks.bench_list_lookup --sizes 1000,10000,100000
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from benchmarks.common import print_summary, summarize
+
+from dotenv import load_dotenv
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from repository import CustomListRepository
+
+ITEMS = ["Pizza 🍕", "Burger 🍔", "Sushi 🍣", "Tacos 🌮", "Pasta 🍝", "Salad 🥗"]
+
+
+async def grow(repo: CustomListRepository, ids: list, size: int) -> None:
+    start = datetime(2024, 1, 1) + timedelta(seconds=len(ids))
+    docs = []
+    for n in range(size - len(ids)):
+        list_id = str(uuid.uuid4())
+        ids.append(list_id)
+        docs.append({
+            "id": list_id,
+            "name": f"bench {len(ids)}",
+            "items": ITEMS,
+            "created_at": str(start + timedelta(seconds=n)),
+        })
+        if len(docs) == 5000:
+            await repo.collection.insert_many(docs, ordered=False)
+            docs = []
+    if docs:
+        await repo.collection.insert_many(docs, ordered=False)
+
+
+async def lookups(repo: CustomListRepository, ids: list, count: int) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for list_id in random.choices(ids, k=count):
+        t0 = time.perf_counter()
+        doc = await repo.get(list_id)
+        latencies.append(time.perf_counter() - t0)
+        assert doc is not None
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def plan_stage(repo: CustomListRepository, list_id: str) -> str:
+    explain = await repo.collection.find({"id": list_id}).explain()
+    stage = explain["queryPlanner"]["winningPlan"]
+    while "inputStage" in stage:
+        stage = stage["inputStage"]
+    return stage["stage"]
+
+
+async def main(args) -> None:
+    load_dotenv()
+    client = AsyncIOMotorClient(os.environ.get("MONGO_URL"))
+    await client.drop_database(args.database)
+    repo = CustomListRepository(client[args.database])
+    ids = []
+    try:
+        for size in args.sizes:
+            await grow(repo, ids, size)
+
+            await repo.collection.drop_indexes()
+            print_summary(f"{size:>8} lists, no index ({await plan_stage(repo, ids[0])})",
+                          await lookups(repo, ids, args.lookups))
+
+            await repo.ensure_indexes()
+            print_summary(f"{size:>8} lists, indexed ({await plan_stage(repo, ids[0])})",
+                          await lookups(repo, ids, args.lookups))
+    finally:
+        await client.drop_database(args.database)
+        client.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")],
+                        default=[1000, 10000, 100000])
+    parser.add_argument("--lookups", type=int, default=500)
+    parser.add_argument("--database", default="food_roulette_bench")
+    asyncio.run(main(parser.parse_args()))
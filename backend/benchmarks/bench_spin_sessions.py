@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Memory and speed of no-repeat spin sessions at --sessions concurrent sessions.
+
+For each wheel size, fills a SessionStore with --sessions sessions over one
+shared item list (as for a premade category or a cached custom list) and
+reports the bytes each session costs, measured with tracemalloc: the store
+entry, session id, shuffle bag and its index array. The items themselves are
+not counted; a session only references them.
+
+For comparison, the same number of sessions are kept the obvious way: an
+OrderedDict of dicts each holding a shuffled copy of the item list and a
+position.
+
+Then times creating sessions, drawing from them, and expiring all of them
+once idle.
+
+    python -m benchmarks.bench_spin_sessions --sessions 100000 --sizes 8,50,250
+"""
+import argparse
+import gc
+import random
+import secrets
+import time
+import tracemalloc
+from collections import OrderedDict
+
+from benchmarks.common import Timer
+
+from sessions import SessionStore
+
+
+def measure(build) -> tuple:
+    """(bytes still allocated by ``build()``, its result)."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return size, result
+
+
+def compact_sessions(items: list, source: dict, count: int) -> SessionStore:
+    store = SessionStore(maxsize=count, idle_ttl=3600)
+    for _ in range(count):
+        store.create(items, source)
+    return store
+
+
+def copied_sessions(items: list, source: dict, count: int) -> OrderedDict:
+    sessions = OrderedDict()
+    for _ in range(count):
+        bag = random.sample(items, len(items))
+        sessions[secrets.token_urlsafe(12)] = {"bag": bag, "position": 0, "source": source,
+                                               "touched": time.monotonic()}
+    return sessions
+
+
+def main(args) -> None:
+    print(f"{args.sessions:,} concurrent sessions")
+    print(f"{'items':>6} {'compact B/session':>18} {'copied B/session':>17} {'compact MB':>11} {'copied MB':>10}")
+    for size in args.sizes:
+        items, source = [f"Food {n}" for n in range(size)], {"category": "bench"}
+        compact, _ = measure(lambda: compact_sessions(items, source, args.sessions))
+        copied, _ = measure(lambda: copied_sessions(items, source, args.sessions))
+        print(f"{size:>6} {compact / args.sessions:>18.0f} {copied / args.sessions:>17.0f} "
+              f"{compact / 1e6:>11.1f} {copied / 1e6:>10.1f}")
+
+    items = [f"Food {n}" for n in range(args.sizes[0])]
+    store = SessionStore(maxsize=args.sessions, idle_ttl=3600)
+    with Timer() as timer:
+        ids = [store.create(items)[0] for _ in range(args.sessions)]
+    print(f"create: {args.sessions / timer.elapsed:,.0f} sessions/s")
+
+    lookups = random.choices(ids, k=args.draws)
+    with Timer() as timer:
+        for session_id in lookups:
+            store.get(session_id).draw()
+    print(f"get + draw: {args.draws / timer.elapsed:,.0f} spins/s")
+
+    store.idle_ttl = 0
+    with Timer() as timer:
+        expired = store.expire()
+    print(f"expire: {expired:,} idle sessions in {timer.elapsed * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=100_000)
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=[8, 50, 250])
+    parser.add_argument("--draws", type=int, default=500_000)
+    main(parser.parse_args())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Spin latency with and without concurrent custom-list writes.
+
+Runs /api/spin at a fixed concurrency twice: once on an idle server and once
+while writers keep POSTing /api/custom-lists. With the async data layer the
+Mongo round-trips yield to the event loop, so spin p99 should stay flat.
+
+Needs a reachable MongoDB (MONGO_URL, see backend/.env). Uses a scratch
+database (food_roulette_bench, or MONGO_DATABASE if set) and drops it
+afterwards.
+
+    python -m benchmarks.bench_spin_under_writes --spins 5000 --writers 8
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import time
+
+from benchmarks.common import app_lifespan, asgi_request, print_summary, summarize
+
+os.environ.setdefault("MONGO_DATABASE", "food_roulette_bench")
+import server
+
+FOODS = ["Pizza 🍕", "Burger 🍔", "Sushi 🍣", "Tacos 🌮", "Pasta 🍝", "Salad 🥗"]
+
+
+async def spin_load(total: int, concurrency: int) -> dict:
+    latencies = []
+    remaining = total
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            status, _, _ = await asgi_request(server.app, "POST", "/api/spin", json_body=FOODS)
+            latencies.append(time.perf_counter() - start)
+            assert status == 200, status
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def write_load(stop: asyncio.Event, counter: list, names) -> None:
+    # List ids are content hashes: a new name per list keeps every write an
+    # insert rather than a no-op upsert of the same document.
+    while not stop.is_set():
+        await asgi_request(
+            server.app, "POST", "/api/custom-lists",
+            json_body=FOODS, query={"name": f"bench-list {next(names)}"},
+        )
+        counter[0] += 1
+        await asyncio.sleep(0)
+
+
+async def main(args) -> None:
+    async with app_lifespan(server.app):
+        await run(args)
+
+
+async def run(args) -> None:
+    await spin_load(200, args.concurrency)  # warm-up
+
+    idle = await spin_load(args.spins, args.concurrency)
+    print_summary("spin (idle)", idle)
+
+    stop = asyncio.Event()
+    written = [0]
+    names = itertools.count()
+    writers = [asyncio.create_task(write_load(stop, written, names)) for _ in range(args.writers)]
+    busy = await spin_load(args.spins, args.concurrency)
+    stop.set()
+    await asyncio.gather(*writers)
+    print_summary(f"spin ({args.writers} writers)", busy)
+    print(f"custom lists written during run: {written[0]}")
+    print(f"p99 ratio busy/idle: {busy['p99_ms'] / max(idle['p99_ms'], 1e-9):.2f}x")
+
+    await server.storage.client.drop_database(server.storage.database)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--spins", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--writers", type=int, default=8)
+    asyncio.run(main(parser.parse_args()))
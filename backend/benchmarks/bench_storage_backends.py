@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Compare the storage backends (memory, SQLite, MongoDB) operation by operation.
+
+Runs the same workload against each backend's repositories directly, so the
+numbers are storage cost without HTTP: single list upserts, bulk import
+batches, point lookups, keyset pages, a full stream, and spin-history and
+spin-stats writes and reads.
+
+SQLite uses a scratch file in a temporary directory. Mongo uses a scratch
+database on MONGO_URL that is dropped afterwards; skip it with
+--backends memory,sqlite when no server is available.
+
+    python -m benchmarks.bench_storage_backends --lists 10000 --backends memory,sqlite,mongo
+"""
+import argparse
+import asyncio
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import print_summary, summarize
+
+from dotenv import load_dotenv
+
+from repository import content_id
+from storage import MongoStorage, create_storage
+
+FOODS = ["Pizza 🍕", "Burger 🍔", "Sushi 🍣", "Tacos 🌮", "Pasta 🍝", "Salad 🥗", "Ramen 🍜", "Curry 🍛"]
+
+
+def make_lists(count: int, offset: int = 0) -> list:
+    start = datetime(2024, 1, 1)
+    lists = []
+    for n in range(offset, offset + count):
+        items = FOODS[n % 4:] + [f"Special {n}"]
+        name = f"bench {n}"
+        lists.append({
+            "id": content_id(name, items),
+            "name": name,
+            "items": items,
+            "created_at": str(start + timedelta(milliseconds=n)),
+        })
+    return lists
+
+
+async def timed(operation, count: int) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for n in range(count):
+        t0 = time.perf_counter()
+        await operation(n)
+        latencies.append(time.perf_counter() - t0)
+    return summarize(latencies, time.perf_counter() - start)
+
+
+async def run_backend(storage, args) -> None:
+    await storage.open()
+    try:
+        lists, history, stats = storage.custom_lists, storage.spin_history, storage.spin_stats
+        for repository in (lists, history, stats):
+            await repository.ensure_indexes()
+        name = storage.name
+
+        singles = make_lists(args.singles, offset=args.lists)
+        print_summary(f"{name}: upsert", await timed(lambda n: lists.upsert(singles[n]), len(singles)))
+
+        bulk = make_lists(args.lists)
+        batches = [bulk[i:i + args.batch] for i in range(0, len(bulk), args.batch)]
+        print_summary(f"{name}: upsert_many x{args.batch}",
+                      await timed(lambda n: lists.upsert_many(batches[n]), len(batches)))
+
+        ids = [doc["id"] for doc in random.choices(bulk, k=args.lookups)]
+        print_summary(f"{name}: get", await timed(lambda n: lists.get(ids[n]), len(ids)))
+
+        positions = [(doc["created_at"], doc["id"]) for doc in random.choices(bulk, k=args.lookups)]
+        print_summary(f"{name}: page of 50", await timed(lambda n: lists.page(50, positions[n]), len(positions)))
+
+        async def stream_all(_):
+            async for _doc in lists.stream():
+                pass
+        print_summary(f"{name}: stream all", await timed(stream_all, 3))
+
+        spins = [
+            [{"selected_food": random.choice(FOODS), "theme_id": "classic", "category": "italian",
+              "timestamp": str(datetime.now())} for _ in range(500)]
+            for _ in range(20)
+        ]
+        print_summary(f"{name}: history insert_many x500",
+                      await timed(lambda n: history.insert_many(spins[n]), len(spins)))
+        print_summary(f"{name}: history recent 50",
+                      await timed(lambda n: history.recent(50, category="italian"), args.lookups))
+
+        deltas = {"food": {food: 3 for food in FOODS}, "total": {"all": 24}}
+        print_summary(f"{name}: stats increment", await timed(lambda n: stats.increment(deltas), 200))
+        print_summary(f"{name}: stats top", await timed(lambda n: stats.top(("food", "total"), 10), 200))
+    finally:
+        if isinstance(storage, MongoStorage):
+            await storage.client.drop_database(storage.database)
+        await storage.close()
+
+
+async def main(args) -> None:
+    load_dotenv()
+    with tempfile.TemporaryDirectory() as scratch:
+        for backend in args.backends:
+            storage = create_storage(
+                backend,
+                mongo_url=os.environ.get("MONGO_URL"),
+                sqlite_path=os.path.join(scratch, "bench.db"),
+            )
+            if isinstance(storage, MongoStorage):
+                storage.database = args.database
+            await run_backend(storage, args)
+            print()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--backends", type=lambda s: s.split(","), default=["memory", "sqlite", "mongo"])
+    parser.add_argument("--lists", type=int, default=10_000, help="lists written by upsert_many")
+    parser.add_argument("--singles", type=int, default=1000, help="lists written one at a time")
+    parser.add_argument("--batch", type=int, default=1000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    parser.add_argument("--database", default="food_roulette_bench")
+    asyncio.run(main(parser.parse_args()))
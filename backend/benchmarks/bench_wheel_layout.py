@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Cost of POST /api/wheel/spin with and without the wheel layout cache.
+
+For each list size, stores a custom list and spins it through the
+in-process app by list_id with a fixed theme:
+
+  cold      layout cache disabled, geometry rebuilt for every spin
+  segments  cached layout, segment paths and colours in the response
+  svg       cached layout, ready-made SVG in the response
+  none      stop angle only, for clients that kept the layout
+
+Plain POST /api/spin with the items in the body is the baseline.
+
+    python -m benchmarks.bench_wheel_layout --sizes 8,50,200 --requests 500
+"""
+import argparse
+import asyncio
+import os
+
+from benchmarks.common import app_lifespan, asgi_request, summarize
+
+os.environ["STORAGE_BACKEND"] = "memory"
+import server
+from wheel import WheelLayoutCache
+
+
+async def measure(path: str, body, requests: int) -> tuple:
+    latencies = []
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    for _ in range(requests):
+        t0 = loop.time()
+        status, _, response = await asgi_request(server.app, "POST", path, json_body=body)
+        latencies.append(loop.time() - t0)
+        assert status == 200, status
+    return len(response), summarize(latencies, loop.time() - start)
+
+
+async def main(args) -> None:
+    async with app_lifespan(server.app):
+        for size in args.sizes:
+            items = [f"Food item {n}" for n in range(size)]
+            _, _, body = await asgi_request(server.app, "POST", "/api/custom-lists",
+                                            json_body=items, query={"name": f"bench {size}"})
+            list_id = server.json.loads(body)["id"]
+            runs = [("spin (items in body)", "/api/spin", items, False)]
+            runs += [
+                (label, "/api/wheel/spin", {"list_id": list_id, "theme_id": "sunset", "layout": layout}, cold)
+                for label, layout, cold in (
+                    ("wheel cold", "segments", True),
+                    ("wheel segments", "segments", False),
+                    ("wheel svg", "svg", False),
+                    ("wheel none", "none", False),
+                )
+            ]
+            for label, path, request, cold in runs:
+                cache = server.wheel_layouts
+                if cold:
+                    server.wheel_layouts = WheelLayoutCache(maxsize=0)
+                try:
+                    size_bytes, stats = await measure(path, request, args.requests)
+                finally:
+                    server.wheel_layouts = cache
+                print(f"{size:>4} items  {label:<22} {size_bytes:>8,} B"
+                      f"  p50 {stats['p50_ms']:>6.2f} ms  p99 {stats['p99_ms']:>6.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=[8, 50, 200])
+    parser.add_argument("--requests", type=int, default=500)
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+/api/spin throughput as the number of serve.py worker processes grows.
+
+For each worker count a fresh server is started on --port, then several
+client processes (so the load generator is not the bottleneck) keep
+spinning over keep-alive connections for --duration seconds.
+
+Needs a reachable MongoDB (MONGO_URL) because spins are recorded to history.
+
+    python -m benchmarks.bench_worker_scaling --workers 1,2,4 --duration 10
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import signal
+import subprocess
+import sys
+import time
+
+from benchmarks.common import BACKEND_DIR, HTTPConnection, print_summary, summarize
+
+FOODS = ["Pizza 🍕", "Burger 🍔", "Sushi 🍣", "Tacos 🌮", "Pasta 🍝", "Salad 🥗"]
+
+
+async def _client_load(url: str, connections: int, duration: float) -> list:
+    latencies = []
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        conn = HTTPConnection(url)
+        try:
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                status, _, _ = await conn.request("POST", "/api/spin", json_body=FOODS)
+                latencies.append(time.perf_counter() - start)
+                assert status == 200, status
+        finally:
+            await conn.close()
+
+    await asyncio.gather(*(worker() for _ in range(connections)))
+    return latencies
+
+
+def client_process(args) -> list:
+    return asyncio.run(_client_load(*args))
+
+
+def wait_until_ready(url: str, timeout: float = 30.0) -> None:
+    async def probe():
+        conn = HTTPConnection(url)
+        try:
+            status, _, _ = await conn.request("GET", "/api/health")
+            return status == 200
+        finally:
+            await conn.close()
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if asyncio.run(probe()):
+                return
+        except OSError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server at {url} did not become ready")
+
+
+def run_workers(workers: int, args) -> dict:
+    url = f"http://127.0.0.1:{args.port}"
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, "serve.py"), "--host", "127.0.0.1",
+         "--port", str(args.port), "--workers", str(workers), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        start_new_session=True,
+    )
+    try:
+        wait_until_ready(url)
+        per_client = max(1, args.connections // args.clients)
+        with multiprocessing.Pool(args.clients) as pool:
+            pool.map(client_process, [(url, per_client, 1.0)] * args.clients)  # warm-up
+            start = time.perf_counter()
+            results = pool.map(client_process, [(url, per_client, args.duration)] * args.clients)
+            elapsed = time.perf_counter() - start
+        return summarize([lat for result in results for lat in result], elapsed)
+    finally:
+        # Graceful shutdown drains spin history; don't wait forever on it.
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            os.killpg(server.pid, signal.SIGKILL)
+            server.wait()
+
+
+def main(args) -> None:
+    baseline = None
+    for workers in args.workers:
+        stats = run_workers(workers, args)
+        print_summary(f"spin, {workers} worker(s)", stats)
+        baseline = baseline or stats["rps"]
+        print(f"{'':<32} scaling vs first run: {stats['rps'] / baseline:.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--workers", type=lambda s: [int(x) for x in s.split(",")],
+                        default=[1, 2, 4])
+    parser.add_argument("--port", type=int, default=8011)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--clients", type=int, default=os.cpu_count() or 2,
+                        help="load-generator processes")
+    parser.add_argument("--connections", type=int, default=64,
+                        help="keep-alive connections across all client processes")
+    main(parser.parse_args())
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+Kiosk spin throughput: POST /api/spin versus the /api/ws/spin channel.
+
+Starts one serve.py worker on --port with the in-memory storage backend,
+then for each connection count keeps every connection spinning for
+--duration seconds, one request in flight per connection:
+
+  http        POST /api/spin with the item list, keep-alive connection
+  ws          register once, then send "1" and wait for the result
+  ws xN       as ws, but each message asks for --batch spins
+
+Reports spins/sec across all connections and per connection.
+
+    python -m benchmarks.bench_ws_spin --connections 1,16,64 --duration 5
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+
+import websockets
+
+from benchmarks.bench_worker_scaling import wait_until_ready
+from benchmarks.common import BACKEND_DIR, HTTPConnection, print_summary, summarize
+
+FOODS = ["Pizza 🍕", "Burger 🍔", "Sushi 🍣", "Tacos 🌮", "Pasta 🍝", "Salad 🥗"]
+
+
+async def http_client(url: str, deadline: float, latencies: list, batch: int) -> int:
+    conn = HTTPConnection(url)
+    spins = 0
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status, _, _ = await conn.request("POST", "/api/spin", json_body=FOODS)
+            latencies.append(time.perf_counter() - start)
+            assert status == 200, status
+            spins += 1
+    finally:
+        await conn.close()
+    return spins
+
+
+async def ws_client(url: str, deadline: float, latencies: list, batch: int) -> int:
+    spins = 0
+    async with websockets.connect(url.replace("http", "ws", 1) + "/api/ws/spin") as ws:
+        await ws.send(json.dumps({"op": "register", "items": FOODS}))
+        assert json.loads(await ws.recv())["op"] == "registered"
+        message = str(batch)
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            await ws.send(message)
+            results = json.loads(await ws.recv())
+            latencies.append(time.perf_counter() - start)
+            spins += len(results)
+    return spins
+
+
+async def measure(client, url: str, connections: int, duration: float, batch: int) -> dict:
+    latencies = []
+    await asyncio.gather(*(client(url, time.perf_counter() + 0.5, [], batch) for _ in range(connections)))
+    start = time.perf_counter()
+    deadline = start + duration
+    spins = await asyncio.gather(*(client(url, deadline, latencies, batch) for _ in range(connections)))
+    elapsed = time.perf_counter() - start
+    stats = summarize(latencies, elapsed)
+    stats["spins_per_s"] = sum(spins) / elapsed
+    return stats
+
+
+def main(args) -> None:
+    url = f"http://127.0.0.1:{args.port}"
+    env = dict(os.environ, STORAGE_BACKEND="memory")
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(BACKEND_DIR, "serve.py"), "--host", "127.0.0.1",
+         "--port", str(args.port), "--workers", "1", "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, start_new_session=True,
+    )
+    try:
+        wait_until_ready(url)
+        modes = [("http", http_client, 1), ("ws", ws_client, 1), (f"ws x{args.batch}", ws_client, args.batch)]
+        for connections in args.connections:
+            for label, client, batch in modes:
+                stats = asyncio.run(measure(client, url, connections, args.duration, batch))
+                print_summary(f"{label}, {connections} conn", stats)
+                print(f"{'':<32} {stats['spins_per_s']:>10.0f} spins/s "
+                      f"({stats['spins_per_s'] / connections:.0f} per connection)")
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            os.killpg(server.pid, signal.SIGKILL)
+            server.wait()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--connections", type=lambda s: [int(x) for x in s.split(",")], default=[1, 16, 64])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--batch", type=int, default=10, help="spins per message for the batched mode")
+    parser.add_argument("--port", type=int, default=8012)
+    main(parser.parse_args())
@@ -0,0 +1,220 @@
+"""Shared helpers for the backend benchmarks.
+
+Requests are driven straight through the ASGI app in-process, so the numbers
+measure the server (routing, validation, handlers, data layer) rather than a
+client library or the loopback network.
+"""
+import asyncio
+import json
+import os
+import sys
+import time
+from contextlib import asynccontextmanager
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+def _encode_body(json_body, content: Optional[bytes], headers: Optional[Dict[str, str]]):
+    headers = {k.lower(): v for k, v in (headers or {}).items()}
+    if json_body is not None:
+        content = json.dumps(json_body).encode()
+        headers.setdefault("content-type", "application/json")
+    content = content or b""
+    if content:
+        headers["content-length"] = str(len(content))
+    return content, headers
+
+
+async def asgi_request(app, method: str, path: str, json_body=None,
+                       query: Optional[dict] = None,
+                       headers: Optional[Dict[str, str]] = None,
+                       content: Optional[bytes] = None) -> Tuple[int, dict, bytes]:
+    """Send one HTTP request through ``app`` and return (status, headers, body)."""
+    body, headers = _encode_body(json_body, content, headers)
+    raw_headers = [(b"host", b"bench")]
+    for key, value in headers.items():
+        raw_headers.append((key.encode(), value.encode()))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method,
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "query_string": urlencode(query or {}, doseq=True).encode(),
+        "headers": raw_headers,
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    sent = False
+
+    async def receive():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return {"type": "http.disconnect"}
+
+    status = 0
+    response_headers = {}
+    chunks = []
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+            response_headers.update(
+                (k.decode(), v.decode()) for k, v in message.get("headers", [])
+            )
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return status, response_headers, b"".join(chunks)
+
+
+@asynccontextmanager
+async def app_lifespan(app):
+    """Run the app's ASGI lifespan startup/shutdown around the block."""
+    inbox: asyncio.Queue = asyncio.Queue()
+    outbox: asyncio.Queue = asyncio.Queue()
+    scope = {"type": "lifespan", "asgi": {"version": "3.0"}, "state": {}}
+    task = asyncio.create_task(app(scope, inbox.get, outbox.put))
+    await inbox.put({"type": "lifespan.startup"})
+    message = await outbox.get()
+    if message["type"] != "lifespan.startup.complete":
+        raise RuntimeError(f"Startup failed: {message.get('message')}")
+    try:
+        yield app
+    finally:
+        await inbox.put({"type": "lifespan.shutdown"})
+        await outbox.get()
+        await task
+
+
+class HTTPConnection:
+    """Minimal keep-alive HTTP/1.1 client for driving a running server.
+
+    One connection serves one benchmark worker at a time, like a browser
+    connection; it reconnects transparently if the server closes it.
+    """
+
+    def __init__(self, url: str):
+        parts = urlsplit(url)
+        self.host = parts.hostname or "localhost"
+        self.port = parts.port or 80
+        self.reader = None
+        self.writer = None
+
+    async def _connect(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def close(self):
+        if self.writer is not None:
+            self.writer.close()
+            self.reader = self.writer = None
+
+    async def request(self, method: str, path: str, json_body=None,
+                      query: Optional[dict] = None,
+                      headers: Optional[Dict[str, str]] = None,
+                      content: Optional[bytes] = None) -> Tuple[int, dict, bytes]:
+        body, headers = _encode_body(json_body, content, headers)
+        target = path + ("?" + urlencode(query, doseq=True) if query else "")
+        head = [f"{method} {target} HTTP/1.1", f"Host: {self.host}:{self.port}"]
+        head += [f"{k}: {v}" for k, v in headers.items()]
+        if "content-length" not in headers and method in ("POST", "PUT", "PATCH"):
+            head.append("content-length: 0")
+        payload = ("\r\n".join(head) + "\r\n\r\n").encode() + body
+
+        for attempt in (0, 1):
+            if self.writer is None:
+                await self._connect()
+            try:
+                self.writer.write(payload)
+                await self.writer.drain()
+                return await self._read_response()
+            except (ConnectionError, asyncio.IncompleteReadError):
+                await self.close()
+                if attempt:
+                    raise
+
+    async def _read_response(self) -> Tuple[int, dict, bytes]:
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError("Server closed the connection")
+        status = int(status_line.split()[1])
+        response_headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            key, _, value = line.decode("latin-1").partition(":")
+            response_headers[key.strip().lower()] = value.strip()
+
+        if "content-length" in response_headers:
+            body = await self.reader.readexactly(int(response_headers["content-length"]))
+        elif response_headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await self.reader.readline()).split(b";")[0], 16)
+                if size == 0:
+                    await self.reader.readline()
+                    break
+                chunks.append(await self.reader.readexactly(size))
+                await self.reader.readline()
+            body = b"".join(chunks)
+        elif status in (204, 304):
+            body = b""
+        else:
+            body = await self.reader.read()
+            await self.close()
+        if response_headers.get("connection", "").lower() == "close":
+            await self.close()
+        return status, response_headers, body
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile of ``samples``."""
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    rank = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[rank]
+
+
+def summarize(latencies: Iterable[float], elapsed: float) -> dict:
+    """Throughput and latency percentiles (milliseconds) for one run."""
+    samples = [lat * 1000.0 for lat in latencies]
+    return {
+        "requests": len(samples),
+        "rps": len(samples) / elapsed if elapsed else 0.0,
+        "p50_ms": percentile(samples, 50),
+        "p95_ms": percentile(samples, 95),
+        "p99_ms": percentile(samples, 99),
+    }
+
+
+def print_summary(label: str, stats: dict) -> None:
+    print(
+        f"{label:<32} {stats['requests']:>7} req  {stats['rps']:>9.1f} req/s  "
+        f"p50 {stats['p50_ms']:7.2f} ms  p95 {stats['p95_ms']:7.2f} ms  "
+        f"p99 {stats['p99_ms']:7.2f} ms"
+    )
+
+
+class Timer:
+    """Context manager measuring wall-clock time with ``perf_counter``."""
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
+        return False
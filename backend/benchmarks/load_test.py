@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Concurrent load test for every Food Roulette API endpoint.
+
+Each scenario hammers one endpoint with --concurrency workers until
+--requests requests have completed, --repeat times, then reports the median
+requests/sec and p50/p95/p99 latency. Results are compared against the stored baseline
+(benchmarks/baseline.json) and regressions beyond --tolerance are flagged;
+baselines are per machine, so re-record one before comparing elsewhere.
+
+    python -m benchmarks.load_test                      # in-process, in-memory store
+    python -m benchmarks.load_test --store sqlite       # in-process, scratch SQLite file
+    python -m benchmarks.load_test --store mongo        # in-process, MONGO_URL
+    python -m benchmarks.load_test --url http://localhost:8001
+    python -m benchmarks.load_test --save-baseline      # record a new baseline
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+from benchmarks.common import HTTPConnection, app_lifespan, asgi_request, print_summary, summarize
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+FOODS = ["Pizza 🍕", "Burger 🍔", "Sushi 🍣", "Tacos 🌮", "Pasta 🍝", "Salad 🥗", "Ramen 🍜", "Curry 🍛"]
+WEIGHTS = [1, 2, 3, 4, 4, 3, 2, 1]
+# List ids are content hashes, so the write scenarios name every list
+# differently to make each request a real insert; the run token keeps
+# repeated runs against one server from colliding.
+RUN_TOKEN = uuid.uuid4().hex[:8]
+_writes = itertools.count()
+
+
+def new_list() -> dict:
+    return {"json_body": FOODS, "query": {"name": f"bench {RUN_TOKEN} {next(_writes)}"}}
+
+
+def new_import() -> dict:
+    batch = next(_writes)
+    rows = [{"name": f"bench import {RUN_TOKEN} {batch}.{n}", "items": FOODS} for n in range(10)]
+    return {"content": json.dumps(rows).encode()}
+
+
+# (name, method, path, request kwargs or a function returning fresh kwargs per
+# request); paths are formatted with the setup context
+SCENARIOS = [
+    ("health", "GET", "/api/health", {}),
+    ("premade-lists", "GET", "/api/premade-lists", {}),
+    ("premade-lists gzip", "GET", "/api/premade-lists", {"headers": {"accept-encoding": "gzip"}}),
+    ("premade-list", "GET", "/api/premade-lists/italian", {}),
+    ("themes", "GET", "/api/themes", {}),
+    ("spin", "POST", "/api/spin", {"json_body": FOODS}),
+    ("spin weighted", "POST", "/api/spin/weighted", {"json_body": {"food_items": FOODS, "weights": WEIGHTS}}),
+    ("spin batch x100", "POST", "/api/spin/batch", {"json_body": {"food_items": FOODS, "count": 100}}),
+    ("spin premade", "POST", "/api/spin/premade/italian", {}),
+    ("spin list by id", "POST", "/api/spin/{list_id}", {}),
+    ("spin session", "POST", "/api/spin-sessions/{session_id}/spin", {}),
+    ("wheel spin segments", "POST", "/api/wheel/spin",
+     {"json_body": {"category": "italian", "theme_id": "sunset", "layout": "segments"}}),
+    ("custom-lists create", "POST", "/api/custom-lists", new_list),
+    ("custom-lists page", "GET", "/api/custom-lists", {"query": {"limit": 50}}),
+    ("custom-lists page gzip", "GET", "/api/custom-lists",
+     {"query": {"limit": 50}, "headers": {"accept-encoding": "gzip"}}),
+    ("custom-list by id", "GET", "/api/custom-lists/{list_id}", {}),
+    ("custom-lists import x10", "POST", "/api/custom-lists/import", new_import),
+    ("spin history", "GET", "/api/spin-history", {"query": {"limit": 50}}),
+    ("stats", "GET", "/api/stats", {"query": {"top": 10}}),
+    ("foods search", "GET", "/api/foods/search", {"query": {"q": "pi"}}),
+    ("cache stats", "GET", "/api/cache/stats", {}),
+    ("metrics", "GET", "/api/metrics", {}),
+]
+
+
+class InProcessClient:
+    def __init__(self, app):
+        self.app = app
+
+    async def request(self, method, path, **kwargs):
+        return await asgi_request(self.app, method, path, **kwargs)
+
+    async def close(self):
+        pass
+
+
+async def run_scenario(make_client, method: str, path: str, kwargs: dict,
+                       total: int, concurrency: int) -> dict:
+    latencies = []
+    failures = []
+    remaining = total
+
+    async def worker():
+        nonlocal remaining
+        client = make_client()
+        try:
+            while remaining > 0:
+                remaining -= 1
+                request_kwargs = kwargs() if callable(kwargs) else kwargs
+                start = time.perf_counter()
+                status, _, body = await client.request(method, path, **request_kwargs)
+                latencies.append(time.perf_counter() - start)
+                if status >= 400:
+                    failures.append((status, body[:200]))
+        finally:
+            await client.close()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    stats = summarize(latencies, time.perf_counter() - start)
+    stats["errors"] = len(failures)
+    if failures:
+        print(f"  first error: {failures[0]}")
+    return stats
+
+
+def _change(new: float, old: float) -> float:
+    return new / old - 1 if old else 0.0
+
+
+def compare(results: dict, baseline: dict, tolerance: float, p99_tolerance: float) -> list:
+    regressions = []
+    for name, stats in results.items():
+        base = baseline.get(name)
+        if not base:
+            continue
+        rps_change = _change(stats["rps"], base["rps"])
+        p50_change = _change(stats["p50_ms"], base["p50_ms"])
+        p99_change = _change(stats["p99_ms"], base["p99_ms"])
+        flag = rps_change < -tolerance or p50_change > tolerance or p99_change > p99_tolerance
+        print(f"{name:<32} req/s {rps_change:+7.1%}  p50 {p50_change:+7.1%}  "
+              f"p99 {p99_change:+7.1%}  {'REGRESSION' if flag else 'ok'}")
+        if flag:
+            regressions.append(name)
+    return regressions
+
+
+async def run(args, make_client) -> dict:
+    setup = make_client()
+    status, _, body = await setup.request(
+        "POST", "/api/custom-lists", json_body=FOODS, query={"name": "bench", "weights": WEIGHTS}
+    )
+    if status != 200:
+        sys.exit(f"Setup failed ({status}): {body[:200]!r}")
+    context = {"list_id": json.loads(body)["id"]}
+    status, _, body = await setup.request("POST", "/api/spin-sessions", json_body={"category": "italian"})
+    await setup.close()
+    if status != 200:
+        sys.exit(f"Setup failed ({status}): {body[:200]!r}")
+    context["session_id"] = json.loads(body)["session_id"]
+
+    results = {}
+    for name, method, path, kwargs in SCENARIOS:
+        if args.only and not any(word in name for word in args.only):
+            continue
+        path = path.format(**context)
+        await run_scenario(make_client, method, path, kwargs, min(args.requests, 100), args.concurrency)
+        runs = [
+            await run_scenario(make_client, method, path, kwargs, args.requests, args.concurrency)
+            for _ in range(args.repeat)
+        ]
+        # Per-metric median over the repeats damps scheduler and GC noise.
+        stats = {key: statistics.median(run[key] for run in runs) for key in runs[0]}
+        print_summary(name, stats)
+        results[name] = stats
+    return results
+
+
+async def main(args) -> int:
+    if args.url:
+        mode = "http"
+        results = await run(args, lambda: HTTPConnection(args.url))
+    else:
+        # The server picks its storage backend at import.
+        os.environ["STORAGE_BACKEND"] = args.store
+        scratch = tempfile.TemporaryDirectory()
+        os.environ["SQLITE_PATH"] = os.path.join(scratch.name, "load_test.db")
+        import server
+
+        mode = f"inprocess-{args.store}"
+        with scratch:
+            async with app_lifespan(server.app):
+                results = await run(args, lambda: InProcessClient(server.app))
+
+    baselines = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baselines = json.load(f)
+
+    if args.save_baseline:
+        baselines[mode] = results
+        with open(args.baseline, "w") as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline for '{mode}' written to {args.baseline}")
+        return 0
+
+    if mode not in baselines:
+        print(f"No '{mode}' baseline in {args.baseline}; run with --save-baseline to record one")
+        return 0
+    print(f"\nCompared with '{mode}' baseline "
+          f"(tolerance {args.tolerance:.0%}, p99 {args.p99_tolerance:.0%}):")
+    regressions = compare(results, baselines[mode], args.tolerance, args.p99_tolerance)
+    if regressions:
+        print(f"Regressions: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--url", help="drive a running server instead of the in-process app")
+    parser.add_argument("--store", choices=["memory", "sqlite", "mongo"], default="memory",
+                        help="storage backend for in-process runs")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per scenario")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--only", nargs="*", help="run scenarios whose name contains any of these")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.25,
+                        help="allowed relative drop in req/s or rise in p50")
+    parser.add_argument("--p99-tolerance", type=float, default=1.0,
+                        help="allowed relative rise in p99, which is noisier")
+    sys.exit(asyncio.run(main(parser.parse_args())))
@@ -0,0 +1,330 @@
+"""Incremental parsing and validation for bulk custom-list imports."""
+import codecs
+import json
+import re
+from datetime import datetime
+from typing import Any, AsyncIterator, Optional, Tuple
+
+from limits import ItemLimits, PayloadTooLarge
+from repository import content_id
+from sampling import validate_weights
+
+_decoder = json.JSONDecoder()
+_WHITESPACE = " \t\r\n"
+
+
+class RowError(ValueError):
+    """A single row could not be parsed or validated."""
+
+
+async def iter_rows(chunks: AsyncIterator[bytes], ndjson: bool,
+                    max_row_size: Optional[int] = None) -> AsyncIterator[Tuple[int, Any]]:
+    """Yield ``(row_number, value)`` pairs as soon as each row is complete.
+
+    ``value`` is a :class:`RowError` for rows that fail to parse. Only the
+    current, unfinished row is ever buffered; a row longer than
+    ``max_row_size`` characters is reported as an error and skipped without
+    buffering the rest of it.
+    """
+    parse = _ndjson_rows if ndjson else _array_rows
+    async for row in parse(_decode(chunks), max_row_size):
+        yield row
+
+
+async def _decode(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    async for chunk in chunks:
+        if chunk:
+            yield decoder.decode(chunk)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+
+def _row_too_large(max_row_size: int) -> RowError:
+    return RowError(f"Row is larger than {max_row_size} characters")
+
+
+async def _ndjson_rows(text: AsyncIterator[str], max_row_size: Optional[int]) -> AsyncIterator[Tuple[int, Any]]:
+    buffer = ""
+    row = 0
+    skipping = False  # inside a row already reported as too large
+
+    def parse(line):
+        try:
+            return json.loads(line)
+        except ValueError as e:
+            return RowError(f"Invalid JSON: {e}")
+
+    async for piece in text:
+        buffer += piece
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            if skipping:
+                skipping = False
+            elif max_row_size is not None and len(line) > max_row_size:
+                yield row, _row_too_large(max_row_size)
+                row += 1
+            elif line.strip():
+                yield row, parse(line)
+                row += 1
+        if max_row_size is not None and len(buffer) > max_row_size:
+            if not skipping:
+                yield row, _row_too_large(max_row_size)
+                row += 1
+                skipping = True
+            buffer = ""
+    if buffer.strip() and not skipping:
+        yield row, parse(buffer)
+
+
+# Inside a container: complete strings and anything but brackets and quotes.
+_CONTAINER_RUN = re.compile(r'(?:"[^"\\]*+(?:\\.[^"\\]*+)*+"|[^"\[\]{}]++)*+')
+# The rest of a string that is still open, up to its closing quote.
+_STRING_REST = re.compile(r'[^"\\]*+(?:\\.[^"\\]*+)*+')
+# What ends or opens something at the top level of a value.
+_TOP_LEVEL = re.compile(r'[\[\]{}",]')
+
+
+class _ValueScanner:
+    """Finds where one JSON value ends as its text arrives piece by piece.
+
+    Every character is scanned once, and strings and scalars are skipped by
+    the regex engine, so a row split over many chunks is decoded once, when
+    it is complete, rather than retried on every chunk.
+    """
+
+    def __init__(self):
+        self.depth = 0
+        self.in_string = False
+        self.escaped = False
+
+    def scan(self, text: str, pos: int) -> int:
+        """Index just past the value, or of the delimiter ending a bare scalar; -1 if not there yet."""
+        size = len(text)
+        while pos < size:
+            if self.in_string:
+                if self.escaped:
+                    self.escaped = False
+                    pos += 1
+                    continue
+                pos = _STRING_REST.match(text, pos).end()
+                if pos == size:
+                    return -1
+                pos += 1
+                if text[pos - 1] == "\\":
+                    # A backslash that is the last character so far
+                    self.escaped = True
+                    continue
+                self.in_string = False
+                if self.depth == 0:
+                    return pos
+                continue
+            if self.depth:
+                pos = _CONTAINER_RUN.match(text, pos).end()
+                if pos == size:
+                    return -1
+            else:
+                match = _TOP_LEVEL.search(text, pos)
+                if match is None:
+                    return -1
+                pos = match.start()
+            char = text[pos]
+            pos += 1
+            if char == '"':
+                self.in_string = True
+            elif char in "[{":
+                self.depth += 1
+            elif self.depth == 0:
+                return pos - 1  # ',' or a closing bracket after a scalar
+            else:
+                self.depth -= 1
+                if self.depth == 0:
+                    return pos
+        return -1
+
+
+async def _array_rows(text: AsyncIterator[str], max_row_size: Optional[int]) -> AsyncIterator[Tuple[int, Any]]:
+    pieces = text.__aiter__()
+    buffer = ""
+    pos = 0
+    row = 0
+    state = "start"  # start -> first -> (value <-> separator) -> end
+    exhausted = False
+    scanner = None   # set while reading a value that starts at pos
+    scanned = 0      # where the scanner resumes
+    skipping = False  # the current value was reported as too large
+
+    while True:
+        if scanner is not None:
+            end = scanner.scan(buffer, scanned)
+            ready = end >= 0
+            if not ready:
+                scanned = len(buffer)
+                if not skipping and max_row_size is not None and len(buffer) - pos > max_row_size:
+                    yield row, _row_too_large(max_row_size)
+                    skipping = True
+                if skipping:
+                    buffer, pos, scanned = "", 0, 0
+        else:
+            while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+                pos += 1
+            ready = pos < len(buffer)
+
+        if not ready:
+            if exhausted:
+                break
+            try:
+                piece = await pieces.__anext__()
+            except StopAsyncIteration:
+                exhausted = True
+                continue
+            buffer, scanned, pos = buffer[pos:] + piece, scanned - pos, 0
+            continue
+
+        if scanner is not None:
+            scanner = None
+            state = "separator"
+            if skipping:
+                skipping = False
+                pos = end
+            elif max_row_size is not None and end - pos > max_row_size:
+                yield row, _row_too_large(max_row_size)
+                pos = end
+            else:
+                try:
+                    value, pos = _decoder.raw_decode(buffer, pos)
+                except ValueError as e:
+                    yield row, RowError(f"Invalid JSON: {e}")
+                    return
+                yield row, value
+            row += 1
+            continue
+
+        char = buffer[pos]
+        if state == "start":
+            if char != "[":
+                yield row, RowError("Body must be a JSON array")
+                return
+            pos += 1
+            state = "first"
+        elif state == "separator" or (state == "first" and char == "]"):
+            pos += 1
+            if char == "]":
+                state = "end"
+            elif char == ",":
+                state = "value"
+            else:
+                yield row, RowError(f"Expected ',' or ']' but found {char!r}")
+                return
+        elif state == "end":
+            yield row, RowError("Unexpected data after the JSON array")
+            return
+        else:
+            scanner = _ValueScanner()
+            scanned = pos
+
+    if scanner is not None and not skipping:
+        # Input ended inside a value; a bare scalar may still be complete.
+        try:
+            value, _ = _decoder.raw_decode(buffer, pos)
+        except ValueError as e:
+            yield row, RowError(f"Invalid JSON: {e}")
+            return
+        yield row, value
+        row += 1
+    if state != "end":
+        yield row, RowError("Unexpected end of input: JSON array is not closed")
+
+
+def build_custom_list(row: Any, limits: Optional[ItemLimits] = None) -> dict:
+    """Validate one import row and turn it into a custom_lists document."""
+    if isinstance(row, RowError):
+        raise row
+    if not isinstance(row, dict):
+        raise RowError("Row must be a JSON object")
+
+    name = row.get("name")
+    items = row.get("items")
+    weights = row.get("weights")
+    if not isinstance(name, str) or not name:
+        raise RowError("'name' must be a non-empty string")
+    if not isinstance(items, list) or not items or not all(isinstance(i, str) for i in items):
+        raise RowError("'items' must be a non-empty list of strings")
+    if limits is not None:
+        try:
+            limits.check(items)
+        except PayloadTooLarge as e:
+            raise RowError(str(e))
+
+    custom_list = {
+        "name": name,
+        "items": items,
+        "created_at": _created_at(row.get("created_at")),
+    }
+    if weights is not None:
+        if not isinstance(weights, list) or not all(
+            isinstance(w, (int, float)) and not isinstance(w, bool) for w in weights
+        ):
+            raise RowError("'weights' must be a list of numbers")
+        try:
+            # JSON integers are unbounded; one too big for a float is not a weight.
+            weights = [float(w) for w in weights]
+        except OverflowError:
+            raise RowError("Weights must be finite and non-negative")
+        try:
+            validate_weights(weights, len(items))
+        except (ValueError, TypeError, OverflowError) as e:
+            raise RowError(str(e))
+        custom_list["weights"] = weights
+    # Ids are always the content hash, so an imported row can neither take
+    # over the id of a different list nor escape deduplication.
+    list_id = content_id(name, items, weights)
+    if row.get("id") is not None and row.get("id") != list_id:
+        raise RowError("'id' does not match the list's content; leave it out to have it derived")
+    custom_list["id"] = list_id
+    return custom_list
+
+
+def _created_at(value: Any) -> str:
+    """An ISO 8601 timestamp, normalised to the local ``str(datetime)`` form used elsewhere."""
+    if value is None:
+        return str(datetime.now())
+    if not isinstance(value, str):
+        raise RowError("'created_at' must be an ISO 8601 timestamp")
+    try:
+        timestamp = datetime.fromisoformat(value)
+    except ValueError:
+        raise RowError("'created_at' must be an ISO 8601 timestamp")
+    if timestamp.tzinfo is not None:
+        try:
+            timestamp = timestamp.astimezone().replace(tzinfo=None)
+        except OverflowError:
+            # Valid, but local time would fall outside years 1-9999
+            raise RowError("'created_at' must be an ISO 8601 timestamp within years 1-9999")
+    return str(timestamp)
+
+
+class ImportReport:
+    """Running totals plus a capped list of per-row errors."""
+
+    def __init__(self, max_errors: int = 1000):
+        self.max_errors = max_errors
+        self.imported = 0
+        self.duplicates = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, row: int, message: str) -> None:
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({"row": row, "error": message})
+
+    def as_dict(self) -> dict:
+        return {
+            "imported": self.imported,
+            "duplicates": self.duplicates,
+            "failed": self.failed,
+            "errors": sorted(self.errors, key=lambda e: e["row"]),
+            "errors_truncated": self.failed > len(self.errors),
+        }
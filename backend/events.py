@@ -0,0 +1,144 @@
+"""In-process pub/sub fan-out for the custom-list feed."""
+import asyncio
+from typing import AsyncIterator, Callable, Optional, Set
+
+# Queued in place of an event to end a subscription.
+_CLOSED = object()
+
+
+class SubscriptionClosed(Exception):
+    """The subscription has ended; no more events will arrive."""
+
+
+class SubscriberLagged(SubscriptionClosed):
+    """The subscriber's queue overflowed and it missed events."""
+
+
+class Subscription:
+    """One subscriber's bounded queue; use as a context manager."""
+
+    def __init__(self, broadcaster: "Broadcaster", max_queue: int):
+        self._broadcaster = broadcaster
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.lagged = False
+
+    async def get(self, timeout: Optional[float] = None):
+        """Next event, or None on timeout; raises SubscriptionClosed at the end."""
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if event is _CLOSED:
+            if self.lagged:
+                raise SubscriberLagged("Subscriber fell behind and was dropped")
+            raise SubscriptionClosed("Feed closed")
+        return event
+
+    def close(self) -> None:
+        self._broadcaster.unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+
+class Broadcaster:
+    """Fans published events out to every subscriber's bounded queue.
+
+    :meth:`publish` never blocks or awaits: a subscriber whose queue is full
+    is dropped (its next :meth:`Subscription.get` raises
+    :class:`SubscriberLagged`) rather than slowing down the publisher or
+    buffering without bound. Feed clients reconnect with the last event id
+    they saw and catch up from there.
+    """
+
+    def __init__(self, max_queue: int = 256, max_subscribers: int = 1000):
+        self.max_queue = max_queue
+        self.max_subscribers = max_subscribers
+        self.published = 0
+        self.dropped = 0
+        self._subscribers: Set[Subscription] = set()
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> Subscription:
+        if len(self._subscribers) >= self.max_subscribers:
+            raise OverflowError("Too many subscribers")
+        subscription = Subscription(self, self.max_queue)
+        self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+
+    def publish(self, event) -> None:
+        self.published += 1
+        for subscription in list(self._subscribers):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self._drop(subscription)
+
+    def _drop(self, subscription: Subscription) -> None:
+        self.dropped += 1
+        subscription.lagged = True
+        self._end(subscription)
+
+    def _end(self, subscription: Subscription) -> None:
+        self._subscribers.discard(subscription)
+        # Make room for the sentinel so the reader wakes up and stops.
+        while subscription.queue.full():
+            subscription.queue.get_nowait()
+        subscription.queue.put_nowait(_CLOSED)
+
+    def close(self) -> None:
+        """End every subscription, e.g. so open streams finish on shutdown."""
+        for subscription in list(self._subscribers):
+            self._end(subscription)
+
+    def stats(self) -> dict:
+        return {"subscribers": len(self._subscribers), "published": self.published, "dropped": self.dropped}
+
+
+class ChangeStreamRelay:
+    """Publishes documents from a change stream, e.g. inserts by other workers.
+
+    ``watch(resume_after)`` is an async generator of ``(resume_token, doc)``;
+    after an error the relay waits ``retry_delay`` seconds and resumes from
+    the last token it saw, so no event is skipped across reconnects.
+    """
+
+    def __init__(self, watch: Callable[[Optional[dict]], AsyncIterator[tuple]],
+                 publish: Callable[[dict], None], retry_delay: float = 5.0):
+        self.watch = watch
+        self.publish = publish
+        self.retry_delay = retry_delay
+        self.resume_token: Optional[dict] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                async for token, doc in self.watch(self.resume_token):
+                    self.resume_token = token
+                    self.publish(doc)
+            except Exception as e:
+                print(f"MongoDB change stream failed: {e}")
+            await asyncio.sleep(self.retry_delay)
@@ -0,0 +1,83 @@
+"""Write-behind buffering for spin history."""
+import asyncio
+from typing import Awaitable, Callable, List
+
+
+class WriteBehindBuffer:
+    """Collects records in memory and writes them in batches.
+
+    A background task flushes whenever ``max_batch`` records are pending or
+    ``flush_interval`` seconds have passed. Once ``max_pending`` records are
+    waiting, :meth:`put` blocks until a flush makes room, so a slow database
+    slows spinners down instead of growing memory without bound.
+    """
+
+    def __init__(self, write: Callable[[List[dict]], Awaitable[None]],
+                 max_batch: int = 500, flush_interval: float = 0.25,
+                 max_pending: int = 10_000):
+        self.write = write
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.written = 0
+        self.dropped = 0
+        self._pending: List[dict] = []
+        self._flush_now = asyncio.Event()
+        self._space = asyncio.Event()
+        self._closing = False
+        self._task = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._closing = False
+            self._task = asyncio.create_task(self._run())
+
+    async def put(self, record: dict) -> None:
+        if self._task is None:
+            self.start()
+        while len(self._pending) >= self.max_pending:
+            self._space.clear()
+            self._flush_now.set()
+            await self._space.wait()
+        self._pending.append(record)
+        if len(self._pending) >= self.max_batch:
+            self._flush_now.set()
+
+    async def close(self) -> None:
+        """Flush everything still pending and stop the background task."""
+        if self._task is None:
+            return
+        self._closing = True
+        self._flush_now.set()
+        await self._task
+        self._task = None
+
+    def stats(self) -> dict:
+        return {"pending": len(self._pending), "written": self.written, "dropped": self.dropped}
+
+    async def _run(self) -> None:
+        while True:
+            try:
+                await asyncio.wait_for(self._flush_now.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._flush_now.clear()
+            # On a timer tick flush whatever is there; otherwise only full batches.
+            while self._pending:
+                await self._flush()
+                if len(self._pending) < self.max_batch and not self._closing:
+                    break
+            if self._closing and not self._pending:
+                return
+
+    async def _flush(self) -> None:
+        batch = self._pending[:self.max_batch]
+        del self._pending[:self.max_batch]
+        self._space.set()
+        try:
+            await self.write(batch)
+            self.written += len(batch)
+        except Exception as e:
+            # History is best-effort: losing a batch must not break spinning.
+            self.dropped += len(batch)
+            print(f"Spin history flush failed, dropped {len(batch)} records: {e}")
@@ -0,0 +1,70 @@
+"""Size limits and a lean parser for item-list request bodies.
+
+POST /api/spin and POST /api/custom-lists take a bare JSON array of strings.
+Declared as a ``List[str]`` parameter, FastAPI buffers the whole body, however
+large, before anything can look at its size. Here the body is capped while it
+streams in, decoded with one ``json.loads`` and checked by a single
+pydantic-core validator that also enforces the item count and length.
+"""
+import json
+from typing import Annotated, AsyncIterator, List, Optional, Sequence
+
+from pydantic import Field, StringConstraints, TypeAdapter, ValidationError
+
+
+class PayloadTooLarge(ValueError):
+    """The body, or the list in it, is over a configured limit."""
+
+
+class InvalidPayload(ValueError):
+    """The body is not a JSON array of strings."""
+
+
+class ItemLimits:
+    """Bounds on an item list: body bytes, item count and item length (characters)."""
+
+    def __init__(self, max_body_bytes: int = 1 << 20, max_items: int = 10_000, max_item_length: int = 200):
+        self.max_body_bytes = max_body_bytes
+        self.max_items = max_items
+        self.max_item_length = max_item_length
+        self._validator = TypeAdapter(
+            Annotated[List[Annotated[str, StringConstraints(max_length=max_item_length)]], Field(max_length=max_items)]
+        )
+
+    def check(self, items: Sequence[str]) -> None:
+        """Raise PayloadTooLarge if ``items`` has too many or too long entries."""
+        if len(items) > self.max_items:
+            raise PayloadTooLarge(f"Too many items (at most {self.max_items})")
+        if items and max(map(len, items)) > self.max_item_length:
+            raise PayloadTooLarge(f"Items must be at most {self.max_item_length} characters")
+
+    async def read(self, chunks: AsyncIterator[bytes], content_length: Optional[str] = None) -> bytearray:
+        """The whole body, refusing to buffer more than ``max_body_bytes``.
+
+        A declared Content-Length over the limit is refused before anything
+        is read; otherwise reading stops at the first chunk past it.
+        """
+        if content_length is not None and content_length.isdigit() and int(content_length) > self.max_body_bytes:
+            raise PayloadTooLarge(f"Body is larger than {self.max_body_bytes} bytes")
+        body = bytearray()
+        async for chunk in chunks:
+            body += chunk
+            if len(body) > self.max_body_bytes:
+                raise PayloadTooLarge(f"Body is larger than {self.max_body_bytes} bytes")
+        return body
+
+    def parse(self, body: bytes) -> List[str]:
+        """Decode a JSON array of strings and check it against the limits."""
+        try:
+            value = json.loads(body)
+        except ValueError as e:
+            raise InvalidPayload(f"Invalid JSON: {e}")
+        try:
+            return self._validator.validate_python(value)
+        except ValidationError as e:
+            error = e.errors()[0]["type"]
+        if error == "too_long":
+            raise PayloadTooLarge(f"Too many items (at most {self.max_items})")
+        if error == "string_too_long":
+            raise PayloadTooLarge(f"Items must be at most {self.max_item_length} characters")
+        raise InvalidPayload("Body must be a JSON array of strings")
@@ -0,0 +1,143 @@
+"""Request and database latency metrics in Prometheus text format.
+
+Everything here runs on the event loop thread, so plain ints and lists are
+enough; no locks and no client library are needed.
+"""
+import bisect
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Tuple
+
+# Seconds; spans sub-millisecond catalog hits up to Mongo's server-selection timeout.
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> Iterable[str]:
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f"{name}_sum{{{labels}}} {self.sum}"
+        yield f"{name}_count{{{labels}}} {self.count}"
+
+
+def _label_value(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self.requests: Dict[Tuple[str, str, int], Histogram] = {}
+        self.db_operations: Dict[Tuple[str, str], Histogram] = {}
+        self.collectors: List[Callable[[], Iterable[Tuple[str, str, str, float]]]] = []
+
+    def observe_request(self, method: str, route: str, status: int, seconds: float) -> None:
+        key = (method, route, status)
+        histogram = self.requests.get(key)
+        if histogram is None:
+            histogram = self.requests[key] = Histogram()
+        histogram.observe(seconds)
+
+    @contextmanager
+    def time_db(self, operation: str, collection: str = "custom_lists"):
+        """Time a database call made inside the ``with`` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            key = (collection, operation)
+            histogram = self.db_operations.get(key)
+            if histogram is None:
+                histogram = self.db_operations[key] = Histogram()
+            histogram.observe(time.perf_counter() - start)
+
+    def add_collector(self, collect: Callable[[], Iterable[Tuple[str, str, str, float]]]) -> None:
+        """Register a callable yielding ``(name, type, help, value)`` samples."""
+        self.collectors.append(collect)
+
+    def render(self) -> str:
+        lines = [
+            "# HELP http_request_duration_seconds HTTP request latency by route and status.",
+            "# TYPE http_request_duration_seconds histogram",
+        ]
+        for (method, route, status), histogram in sorted(self.requests.items()):
+            labels = f'method="{method}",route="{_label_value(route)}",status="{status}"'
+            lines.extend(histogram.render("http_request_duration_seconds", labels))
+
+        lines += [
+            "# HELP db_operation_duration_seconds Database call latency by collection and operation.",
+            "# TYPE db_operation_duration_seconds histogram",
+        ]
+        for (collection, operation), histogram in sorted(self.db_operations.items()):
+            labels = f'collection="{collection}",operation="{operation}"'
+            lines.extend(histogram.render("db_operation_duration_seconds", labels))
+
+        for collect in self.collectors:
+            for name, kind, help_text, value in collect():
+                lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {value}"]
+        return "\n".join(lines) + "\n"
+
+
+class RouteLabeler:
+    """Maps a finished request's scope to its route's path template.
+
+    Routes are labelled by template (``/api/spin/{list_id}``), not the
+    concrete URL, so label cardinality stays bounded.
+    """
+
+    def __init__(self):
+        self._route_paths = None
+
+    def __call__(self, scope) -> str:
+        if self._route_paths is None:
+            router_app = scope.get("app")
+            routes = getattr(router_app, "routes", [])
+            self._route_paths = {
+                route.endpoint: route.path for route in routes if hasattr(route, "endpoint")
+            }
+        return self._route_paths.get(scope.get("endpoint"), "unmatched")
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording latency per route template and status."""
+
+    def __init__(self, app, registry: MetricsRegistry):
+        self.app = app
+        self.registry = registry
+        self._route_for = RouteLabeler()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            self.registry.observe_request(
+                scope["method"], self._route_for(scope), status, time.perf_counter() - start
+            )
@@ -0,0 +1,54 @@
+"""Responses for data that is fixed for the lifetime of the process."""
+import hashlib
+import json
+
+from fastapi import Request
+from fastapi.responses import Response
+
+from compression import BEST_LEVELS, PREFERENCE, compress, negotiate
+
+CATALOG_CACHE_CONTROL = "public, max-age=3600"
+
+
+class StaticPayload:
+    """A JSON body encoded once, served with a strong ETag.
+
+    The bytes match what FastAPI's JSONResponse would produce, so switching an
+    endpoint to a StaticPayload does not change what clients receive. The body
+    is also compressed once, at the best level, with every available encoding
+    that makes it smaller; each variant gets its own ETag.
+    """
+
+    def __init__(self, content, cache_control: str = CATALOG_CACHE_CONTROL):
+        self.body = json.dumps(
+            content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+        ).encode("utf-8")
+        digest = hashlib.sha256(self.body).hexdigest()[:32]
+        self.etag = '"' + digest + '"'
+        self.headers = {"ETag": self.etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+        self.encoded = {}
+        for encoding in PREFERENCE:
+            data = compress(encoding, self.body, BEST_LEVELS[encoding])
+            if len(data) < len(self.body):
+                self.encoded[encoding] = (data, {
+                    **self.headers, "ETag": f'"{digest}-{encoding}"', "Content-Encoding": encoding,
+                })
+        self._etags = {self.etag} | {headers["ETag"] for _, headers in self.encoded.values()}
+
+    def not_modified(self, request: Request) -> bool:
+        header = request.headers.get("if-none-match")
+        if not header:
+            return False
+        for tag in header.split(","):
+            tag = tag.strip()
+            # If-None-Match uses weak comparison, so W/"x" matches "x".
+            if tag == "*" or tag.removeprefix("W/") in self._etags:
+                return True
+        return False
+
+    def response(self, request: Request) -> Response:
+        encoding = negotiate(request.headers.get("accept-encoding"), self.encoded)
+        body, headers = self.encoded[encoding] if encoding else (self.body, self.headers)
+        if self.not_modified(request):
+            return Response(status_code=304, headers=headers)
+        return Response(body, media_type="application/json", headers=headers)
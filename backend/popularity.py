@@ -0,0 +1,134 @@
+"""Incrementally maintained spin leaderboards."""
+import asyncio
+import heapq
+from collections import Counter
+from typing import Dict, List, Tuple
+
+# Leaderboards kept per process; "total" holds the overall spin count.
+KINDS = ("food", "category", "theme")
+
+
+class BoundedCounter:
+    """Counter that keeps at most ~2x ``capacity`` keys.
+
+    When it grows past that it is pruned back to the ``capacity`` heaviest
+    keys, so memory and query cost do not depend on the number of distinct
+    items ever seen. Counts of long-tail items can be undercounted; the
+    exact totals live in the folded Mongo documents.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.counts: Dict[str, int] = {}
+
+    def add(self, key: str, amount: int = 1) -> None:
+        self.counts[key] = self.counts.get(key, 0) + amount
+        if len(self.counts) > 2 * self.capacity:
+            self.counts = dict(self.top(self.capacity))
+
+    def top(self, n: int) -> List[Tuple[str, int]]:
+        return heapq.nlargest(n, self.counts.items(), key=lambda item: item[1])
+
+
+class PopularityStats:
+    """In-memory leaderboards, periodically folded into ``repository``.
+
+    Every recorded spin bumps the in-memory counters and a pending delta. A
+    fold ``$inc``s the deltas into pre-aggregated documents (one per kind and
+    key) and then reseeds the counters from the aggregated top entries, so
+    each worker also sees what the others have folded.
+    """
+
+    def __init__(self, repository, capacity: int = 1000, fold_interval: float = 30.0):
+        self.repository = repository
+        self.capacity = capacity
+        self.fold_interval = fold_interval
+        self.total = 0
+        self.counters = {kind: BoundedCounter(capacity) for kind in KINDS}
+        self._pending: Dict[str, Counter] = {kind: Counter() for kind in KINDS + ("total",)}
+        self._stop = asyncio.Event()
+        self._task = None
+
+    def record(self, food: str, theme_id: str, category: str = None) -> None:
+        self.total += 1
+        self._pending["total"]["all"] += 1
+        for kind, key in (("food", food), ("theme", theme_id), ("category", category)):
+            if key is not None:
+                self.counters[kind].add(key)
+                self._pending[kind][key] += 1
+
+    def snapshot(self, top: int) -> dict:
+        board = {
+            kind: [{"name": key, "count": count} for key, count in self.counters[kind].top(top)]
+            for kind in KINDS
+        }
+        return {
+            "total_spins": self.total,
+            "foods": board["food"],
+            "categories": board["category"],
+            "themes": board["theme"],
+        }
+
+    async def load(self) -> None:
+        """Seed the counters from the folded documents."""
+        top = await self.repository.top(KINDS + ("total",), self.capacity)
+        self._reseed(top)
+
+    async def fold(self) -> None:
+        pending, self._pending = self._pending, {kind: Counter() for kind in self._pending}
+        if not any(pending.values()):
+            return
+        try:
+            await self.repository.increment(pending)
+        except BaseException:
+            # Not applied: keep the deltas for the next fold (also when cancelled).
+            for kind, deltas in pending.items():
+                self._pending[kind].update(deltas)
+            raise
+        # The deltas are stored now. If reseeding fails the counters stay as
+        # they are, already including them, until the next fold reseeds.
+        top = await self.repository.top(KINDS + ("total",), self.capacity)
+        self._reseed(top)
+
+    def _reseed(self, top: Dict[str, List[Tuple[str, int]]]) -> None:
+        # Folded totals plus whatever was recorded while the fold was running.
+        for kind in KINDS:
+            counter = BoundedCounter(self.capacity)
+            counter.counts = dict(top.get(kind, []))
+            for key, count in self._pending[kind].items():
+                counter.add(key, count)
+            self.counters[kind] = counter
+        folded_total = sum(count for _, count in top.get("total", []))
+        self.total = folded_total + self._pending["total"]["all"]
+
+    def start(self) -> None:
+        if self._task is None:
+            self._stop.clear()
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        """Stop the background task, letting a running fold finish, and fold once more."""
+        if self._task is not None:
+            self._stop.set()
+            await self._task
+            self._task = None
+        try:
+            await self.fold()
+        except Exception as e:
+            print(f"Spin stats fold failed: {e}")
+
+    async def _run(self) -> None:
+        try:
+            await self.load()
+        except Exception as e:
+            print(f"Spin stats load failed: {e}")
+        while True:
+            try:
+                await asyncio.wait_for(self._stop.wait(), timeout=self.fold_interval)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await self.fold()
+            except Exception as e:
+                print(f"Spin stats fold failed: {e}")
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Opt-in cProfile sampling of individual requests.
+
+A request is profiled when it carries a valid signed ``X-Profile`` header or
+wins a ``sample_rate`` coin flip. Each profile is dumped to
+``<directory>/<route>/<ms>-<n>.prof`` (open it with ``python -m pstats`` or
+snakeviz) and summarized in memory for ``/api/profiles``.
+
+Sign a header that stays valid for five minutes with:
+
+    PROFILE_SECRET=... python profiling.py sign --ttl 300
+"""
+import argparse
+import asyncio
+import cProfile
+import collections
+import hashlib
+import hmac
+import os
+import pstats
+import random
+import re
+import time
+from typing import List, Optional
+
+from metrics import RouteLabeler
+
+PROFILE_HEADER = b"x-profile"
+
+
+def sign_profile_header(secret: str, ttl: float = 300.0, now: Optional[float] = None) -> str:
+    """``<expires>:<hmac>`` value for the X-Profile header."""
+    expires = str(int((time.time() if now is None else now) + ttl))
+    digest = hmac.new(secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+    return f"{expires}:{digest}"
+
+
+def _route_dir(route: str) -> str:
+    return re.sub(r"[^A-Za-z0-9]+", "_", route).strip("_") or "root"
+
+
+class RequestProfiler:
+    """Decides which requests to profile and keeps the ``keep`` most recent.
+
+    Older dumps are deleted as newer ones arrive, so the directory stays
+    bounded like the in-memory summaries. Signed headers expiring more than
+    ``max_ttl`` seconds out are rejected, so a leaked one cannot live forever.
+    """
+
+    def __init__(self, directory: str, sample_rate: float = 0.0,
+                 secret: Optional[str] = None, keep: int = 100, top_functions: int = 8,
+                 max_ttl: float = 3600.0):
+        self.directory = directory
+        self.sample_rate = sample_rate
+        self.secret = secret or None
+        self.max_ttl = max_ttl
+        self.top_functions = top_functions
+        self.profiled = 0
+        self._recent = collections.deque()
+        self._keep = keep
+        self._seq = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.sample_rate > 0 or self.secret is not None
+
+    def verify(self, value: str, now: Optional[float] = None) -> bool:
+        if self.secret is None:
+            return False
+        expires, _, digest = value.partition(":")
+        now = time.time() if now is None else now
+        try:
+            if not now <= int(expires) <= now + self.max_ttl:
+                return False
+        except ValueError:
+            return False
+        expected = hmac.new(self.secret.encode(), expires.encode(), hashlib.sha256).hexdigest()
+        return hmac.compare_digest(digest, expected)
+
+    def wants(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == PROFILE_HEADER:
+                return self.verify(value.decode("latin-1"))
+        return self.sample_rate > 0 and random.random() < self.sample_rate
+
+    def summarize(self, profile: cProfile.Profile) -> List[dict]:
+        """The functions with the most own time."""
+        stats = pstats.Stats(profile).stats
+        top = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:self.top_functions]
+        return [
+            {
+                "function": f"{func} ({os.path.basename(filename)}:{line})",
+                "calls": calls,
+                "own_ms": round(own * 1000, 3),
+                "cumulative_ms": round(cumulative * 1000, 3),
+            }
+            for (filename, line, func), (_, calls, own, cumulative, _) in top
+        ]
+
+    async def save(self, profile: cProfile.Profile, entry: dict) -> None:
+        self._seq += 1
+        path = os.path.join(self.directory, _route_dir(entry["route"]),
+                            f"{int(time.time() * 1000)}-{self._seq}.prof")
+        entry["top_functions"] = self.summarize(profile)
+        entry["dump"] = path
+        evicted = []
+        self._recent.append(entry)
+        while len(self._recent) > self._keep:
+            evicted.append(self._recent.popleft()["dump"])
+        self.profiled += 1
+        loop = asyncio.get_running_loop()
+        await loop.run_in_executor(None, self._write, profile, path, evicted)
+
+    @staticmethod
+    def _write(profile: cProfile.Profile, path: str, evicted: List[str]) -> None:
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            profile.dump_stats(path)
+            for old in evicted:
+                try:
+                    os.remove(old)
+                except FileNotFoundError:
+                    pass
+        except OSError as e:
+            print(f"Profile dump failed: {e}")
+
+    def slowest(self, limit: int) -> List[dict]:
+        return sorted(self._recent, key=lambda entry: entry["duration_ms"], reverse=True)[:limit]
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware running selected requests under cProfile.
+
+    cProfile sees the whole thread, so time spent in other requests'
+    coroutines while this one awaits lands in its profile too. Only one
+    request is profiled at a time to keep that noise (and the overhead) down.
+    """
+
+    def __init__(self, app, profiler: RequestProfiler):
+        self.app = app
+        self.profiler = profiler
+        self._route_for = RouteLabeler()
+        self._active = False
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or not self.profiler.enabled or self._active
+                or not self.profiler.wants(scope)):
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self._active = True
+        profile = cProfile.Profile()
+        start = time.perf_counter()
+        profile.enable()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profile.disable()
+            duration = time.perf_counter() - start
+            self._active = False
+            try:
+                await self.profiler.save(profile, {
+                    "method": scope["method"],
+                    "route": self._route_for(scope),
+                    "path": scope["path"],
+                    "status": status,
+                    "duration_ms": round(duration * 1000, 3),
+                    "at": time.time(),
+                })
+            except Exception as e:
+                print(f"Profile save failed: {e}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sign an X-Profile request header")
+    parser.add_argument("command", choices=["sign"])
+    parser.add_argument("--ttl", type=float, default=300.0, help="seconds the header stays valid")
+    args = parser.parse_args()
+    secret = os.environ.get("PROFILE_SECRET")
+    if not secret:
+        parser.error("PROFILE_SECRET is not set")
+    print(f"X-Profile: {sign_profile_header(secret, args.ttl)}")
@@ -0,0 +1,453 @@
+"""Async data access for the food_roulette database.
+
+The server talks to storage only through the interfaces below; MongoDB and
+in-memory implementations live here, SQLite in :mod:`sqlite_repository`.
+"""
+import base64
+import bisect
+import collections
+import hashlib
+import json
+from typing import AsyncIterator, Dict, List, Optional, Protocol, Tuple
+
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+
+# Keyset order for custom lists: oldest first, ``id`` breaks created_at ties.
+LIST_SORT = [("created_at", 1), ("id", 1)]
+LIST_PROJECTION = {
+    "_id": 0, "id": 1, "name": 1, "items": 1, "item_refs": 1, "weights": 1, "created_at": 1,
+}
+
+
+def content_id(name: str, items: List[str], weights: Optional[List[float]] = None) -> str:
+    """Id derived from a list's normalized content.
+
+    Surrounding whitespace and int-vs-float weights do not change the id, so
+    resubmitting the same list maps onto the document that already exists.
+    """
+    canonical = json.dumps(
+        [name.strip(), [item.strip() for item in items],
+         None if weights is None else [float(w) for w in weights]],
+        ensure_ascii=False, separators=(",", ":"),
+    )
+    return hashlib.sha256(canonical.encode()).hexdigest()[:32]
+
+
+def item_ref(name: str) -> int:
+    """Signed 64-bit reference to ``name`` in the food_items dictionary."""
+    digest = hashlib.blake2b(name.encode(), digest_size=8).digest()
+    return int.from_bytes(digest, "big", signed=True)
+
+
+def encode_cursor(doc: dict) -> str:
+    """Opaque pagination cursor pointing just past ``doc``."""
+    raw = json.dumps([doc["created_at"], doc["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Inverse of :func:`encode_cursor`; raises ValueError on garbage."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, list_id = json.loads(raw)
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(created_at, str) or not isinstance(list_id, str):
+        raise ValueError("Invalid cursor")
+    return created_at, list_id
+
+
+def _after(position: Optional[Tuple[str, str]]) -> dict:
+    if position is None:
+        return {}
+    created_at, list_id = position
+    return {"$or": [
+        {"created_at": {"$gt": created_at}},
+        {"created_at": created_at, "id": {"$gt": list_id}},
+    ]}
+
+
+class CustomListStore(Protocol):
+    """Custom lists keyed by ``id``, read in (created_at, id) keyset order."""
+
+    async def ensure_indexes(self) -> None: ...
+
+    async def upsert(self, custom_list: dict) -> Tuple[dict, bool]: ...
+
+    async def upsert_many(self, custom_lists: List[dict]) -> Tuple[List[Tuple[int, str]], List[int]]: ...
+
+    async def get(self, list_id: str) -> Optional[dict]: ...
+
+    async def page(self, limit: int,
+                   after: Optional[Tuple[str, str]] = None) -> Tuple[List[dict], Optional[str]]: ...
+
+    def stream(self, after: Optional[Tuple[str, str]] = None,
+               limit: Optional[int] = None, batch_size: int = 500) -> AsyncIterator[dict]: ...
+
+
+class SpinHistoryStore(Protocol):
+    """Append-only spin records, read newest first."""
+
+    async def ensure_indexes(self) -> None: ...
+
+    async def insert_many(self, spins: List[dict]) -> None: ...
+
+    async def recent(self, limit: int, **filters) -> List[dict]: ...
+
+
+class SpinStatsStore(Protocol):
+    """Spin counters per (kind, key)."""
+
+    async def ensure_indexes(self) -> None: ...
+
+    async def increment(self, deltas: Dict[str, Dict[str, int]]) -> None: ...
+
+    async def top(self, kinds, limit: int) -> Dict[str, List[Tuple[str, int]]]: ...
+
+
+class ItemDictionary:
+    """The food_items collection: each distinct item string stored once.
+
+    Lists reference items by :func:`item_ref`, a 64-bit hash, so a ref can be
+    computed without a round trip and the same string always interns to the
+    same ref in every worker. Resolved names are kept in an LRU of at most
+    ``max_names`` entries; a name that fell out is looked up (or upserted,
+    idempotently) again.
+    """
+
+    def __init__(self, db=None, max_names: int = 100_000):
+        self.collection = None
+        self.max_names = max_names
+        self._names: "collections.OrderedDict[int, str]" = collections.OrderedDict()
+        if db is not None:
+            self.bind(db)
+
+    def bind(self, db) -> None:
+        self.collection = db.food_items
+
+    def _remember(self, names: Dict[int, str]) -> None:
+        self._names.update(names)
+        while len(self._names) > self.max_names:
+            self._names.popitem(last=False)
+
+    async def intern(self, names: List[str]) -> List[int]:
+        refs = [item_ref(name) for name in names]
+        new = {ref: name for ref, name in zip(refs, names) if ref not in self._names}
+        if new:
+            await self.collection.bulk_write([
+                UpdateOne({"_id": ref}, {"$setOnInsert": {"name": name}}, upsert=True)
+                for ref, name in new.items()
+            ], ordered=False)
+            self._remember(new)
+        return refs
+
+    async def resolve(self, refs) -> Dict[int, str]:
+        """Names for ``refs``, from the LRU or else the collection."""
+        cached = self._names
+        found, missing = {}, []
+        for ref in set(refs):
+            name = cached.get(ref)
+            if name is None:
+                missing.append(ref)
+            else:
+                cached.move_to_end(ref)
+                found[ref] = name
+        if missing:
+            loaded = {}
+            async for doc in self.collection.find({"_id": {"$in": missing}}):
+                loaded[doc["_id"]] = doc["name"]
+            self._remember(loaded)
+            found.update(loaded)
+        return found
+
+
+class CustomListRepository:
+    """Non-blocking access to the custom_lists collection via motor.
+
+    Documents are stored content-addressed (see :func:`content_id`) with
+    ``item_refs`` into the :class:`ItemDictionary` in place of item names;
+    every read hands back the usual ``items`` list. Documents written before
+    interning still carry ``items`` and are returned as stored.
+    """
+
+    def __init__(self, db=None):
+        self.collection = None
+        self.items = ItemDictionary()
+        if db is not None:
+            self.bind(db)
+
+    def bind(self, db) -> None:
+        self.collection = db.custom_lists
+        self.items.bind(db)
+
+    async def ensure_indexes(self) -> None:
+        """Create the collection's indexes; a no-op when they already exist."""
+        await self.collection.create_index("id", unique=True, name="id_unique")
+        # Serves both ORDER BY created_at and the keyset pagination predicate.
+        await self.collection.create_index(LIST_SORT, name="created_at_id")
+
+    async def _encode(self, custom_list: dict) -> dict:
+        # ``id`` comes from the upsert filter.
+        stored = {key: value for key, value in custom_list.items() if key not in ("id", "items")}
+        stored["item_refs"] = await self.items.intern(custom_list["items"])
+        return stored
+
+    async def _decode(self, docs: List[dict]) -> List[dict]:
+        refs = [ref for doc in docs for ref in doc.get("item_refs", ())]
+        names = await self.items.resolve(refs) if refs else {}
+        for doc in docs:
+            if "item_refs" in doc:
+                doc["items"] = [names[ref] for ref in doc.pop("item_refs")]
+        return docs
+
+    async def upsert(self, custom_list: dict) -> Tuple[dict, bool]:
+        """Store ``custom_list`` unless its id exists; idempotent.
+
+        Returns the stored document and whether this call created it. An
+        existing document is never modified, so resubmitting a list hands
+        back the original (including its ``created_at``).
+        """
+        stored = await self._encode(custom_list)
+        try:
+            existing = await self.collection.find_one_and_update(
+                {"id": custom_list["id"]}, {"$setOnInsert": stored},
+                projection=LIST_PROJECTION, upsert=True,
+            )
+        except DuplicateKeyError:
+            # Lost an upsert race on the unique index; the winner's doc is it.
+            existing = await self.collection.find_one({"id": custom_list["id"]}, LIST_PROJECTION)
+        if existing is None:
+            return dict(custom_list), True
+        return (await self._decode([existing]))[0], False
+
+    async def upsert_many(self, custom_lists: List[dict]) -> Tuple[List[Tuple[int, str]], List[int]]:
+        """Unordered bulk upsert.
+
+        Returns ``(index, message)`` for failed docs and the indexes of the
+        docs that were newly created; the rest already existed. With
+        ``ordered=False`` Mongo keeps going past bad documents, so one failure
+        does not drop the rest of the batch.
+        """
+        refs = await self.items.intern([item for doc in custom_lists for item in doc["items"]])
+        updates, offset = [], 0
+        for doc in custom_lists:
+            stored = {key: value for key, value in doc.items() if key not in ("id", "items")}
+            stored["item_refs"] = refs[offset:offset + len(doc["items"])]
+            offset += len(doc["items"])
+            updates.append(UpdateOne({"id": doc["id"]}, {"$setOnInsert": stored}, upsert=True))
+        try:
+            result = await self.collection.bulk_write(updates, ordered=False)
+        except BulkWriteError as e:
+            details = e.details
+            failures = [(err["index"], err.get("errmsg", "Write failed")) for err in details.get("writeErrors", [])]
+            created = [upsert["index"] for upsert in details.get("upserted", [])]
+            return failures, created
+        return [], sorted(result.upserted_ids)
+
+    async def get(self, list_id: str) -> Optional[dict]:
+        """Point lookup through the unique ``id`` index."""
+        doc = await self.collection.find_one({"id": list_id}, LIST_PROJECTION)
+        return (await self._decode([doc]))[0] if doc is not None else None
+
+    async def page(self, limit: int,
+                   after: Optional[Tuple[str, str]] = None) -> Tuple[List[dict], Optional[str]]:
+        """Return up to ``limit`` lists after ``after`` plus the next cursor."""
+        docs = await (
+            self.collection.find(_after(after), LIST_PROJECTION)
+            .sort(LIST_SORT)
+            .limit(limit + 1)
+            .to_list(length=limit + 1)
+        )
+        if len(docs) <= limit:
+            return await self._decode(docs), None
+        docs = await self._decode(docs[:limit])
+        return docs, encode_cursor(docs[-1])
+
+    async def stream(self, after: Optional[Tuple[str, str]] = None,
+                     limit: Optional[int] = None,
+                     batch_size: int = 500) -> AsyncIterator[dict]:
+        """Yield lists in keyset order as the Mongo cursor delivers them.
+
+        Item refs are resolved one cursor batch at a time.
+        """
+        cursor = (
+            self.collection.find(_after(after), LIST_PROJECTION)
+            .sort(LIST_SORT)
+            .batch_size(batch_size)
+        )
+        if limit is not None:
+            cursor = cursor.limit(limit)
+        batch = []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) >= batch_size:
+                for decoded in await self._decode(batch):
+                    yield decoded
+                batch = []
+        for decoded in await self._decode(batch):
+            yield decoded
+
+    async def watch(self, resume_after: Optional[dict] = None) -> AsyncIterator[Tuple[dict, dict]]:
+        """Yield ``(resume_token, list)`` for every list inserted from now on.
+
+        Uses a change stream, so it needs a replica set or sharded cluster.
+        """
+        pipeline = [{"$match": {"operationType": "insert"}}]
+        async with self.collection.watch(pipeline, resume_after=resume_after) as changes:
+            async for change in changes:
+                doc = {key: value for key, value in change["fullDocument"].items()
+                       if key in LIST_PROJECTION and key != "_id"}
+                yield change["_id"], (await self._decode([doc]))[0]
+
+
+class SpinHistoryRepository:
+    """The spin_history collection; written in batches by the history buffer."""
+
+    def __init__(self, db=None):
+        self.collection = None
+        if db is not None:
+            self.bind(db)
+
+    def bind(self, db) -> None:
+        self.collection = db.spin_history
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("timestamp", -1)], name="timestamp_desc")
+
+    async def insert_many(self, spins: List[dict]) -> None:
+        await self.collection.insert_many([dict(spin) for spin in spins], ordered=False)
+
+    async def recent(self, limit: int, **filters) -> List[dict]:
+        """Newest spins first, optionally filtered on ``list_id``/``category``."""
+        query = {key: value for key, value in filters.items() if value is not None}
+        return await (
+            self.collection.find(query, {"_id": 0})
+            .sort("timestamp", -1)
+            .limit(limit)
+            .to_list(length=limit)
+        )
+
+
+class SpinStatsRepository:
+    """Pre-aggregated spin counters: one ``{kind, key, count}`` doc per entry."""
+
+    def __init__(self, db=None):
+        self.collection = None
+        if db is not None:
+            self.bind(db)
+
+    def bind(self, db) -> None:
+        self.collection = db.spin_stats
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index([("kind", 1), ("key", 1)], unique=True, name="kind_key")
+        await self.collection.create_index([("kind", 1), ("count", -1)], name="kind_count")
+
+    async def increment(self, deltas: Dict[str, Dict[str, int]]) -> None:
+        updates = [
+            UpdateOne({"kind": kind, "key": key}, {"$inc": {"count": amount}}, upsert=True)
+            for kind, counts in deltas.items()
+            for key, amount in counts.items()
+        ]
+        if updates:
+            await self.collection.bulk_write(updates, ordered=False)
+
+    async def top(self, kinds, limit: int) -> Dict[str, List[Tuple[str, int]]]:
+        result = {}
+        for kind in kinds:
+            docs = await (
+                self.collection.find({"kind": kind}, {"_id": 0, "key": 1, "count": 1})
+                .sort("count", -1)
+                .limit(limit)
+                .to_list(length=limit)
+            )
+            result[kind] = [(doc["key"], doc["count"]) for doc in docs]
+        return result
+
+
+class InMemoryCustomListRepository:
+    """Process-local stand-in for CustomListRepository (tests, benchmarks)."""
+
+    def __init__(self):
+        self._by_id = {}
+        self._order = []  # sorted (created_at, id) keys
+
+    async def ensure_indexes(self) -> None:
+        pass
+
+    def _add(self, custom_list: dict) -> Tuple[dict, bool]:
+        existing = self._by_id.get(custom_list["id"])
+        if existing is not None:
+            return dict(existing), False
+        self._by_id[custom_list["id"]] = dict(custom_list)
+        bisect.insort(self._order, (custom_list["created_at"], custom_list["id"]))
+        return dict(custom_list), True
+
+    async def upsert(self, custom_list: dict) -> Tuple[dict, bool]:
+        return self._add(custom_list)
+
+    async def upsert_many(self, custom_lists: List[dict]) -> Tuple[List[Tuple[int, str]], List[int]]:
+        return [], [index for index, doc in enumerate(custom_lists) if self._add(doc)[1]]
+
+    async def get(self, list_id: str) -> Optional[dict]:
+        doc = self._by_id.get(list_id)
+        return dict(doc) if doc is not None else None
+
+    def _start(self, after: Optional[Tuple[str, str]]) -> int:
+        return bisect.bisect_right(self._order, tuple(after)) if after else 0
+
+    async def page(self, limit: int,
+                   after: Optional[Tuple[str, str]] = None) -> Tuple[List[dict], Optional[str]]:
+        start = self._start(after)
+        keys = self._order[start:start + limit + 1]
+        docs = [dict(self._by_id[list_id]) for _, list_id in keys[:limit]]
+        return docs, encode_cursor(docs[-1]) if len(keys) > limit else None
+
+    async def stream(self, after: Optional[Tuple[str, str]] = None,
+                     limit: Optional[int] = None,
+                     batch_size: int = 500) -> AsyncIterator[dict]:
+        start = self._start(after)
+        end = len(self._order) if limit is None else min(len(self._order), start + limit)
+        for _, list_id in self._order[start:end]:
+            yield dict(self._by_id[list_id])
+
+
+class InMemorySpinHistoryRepository:
+    """Process-local stand-in for SpinHistoryRepository, capped at ``maxlen``."""
+
+    def __init__(self, maxlen: int = 100_000):
+        self._spins = collections.deque(maxlen=maxlen)
+
+    async def ensure_indexes(self) -> None:
+        pass
+
+    async def insert_many(self, spins: List[dict]) -> None:
+        self._spins.extend(dict(spin) for spin in spins)
+
+    async def recent(self, limit: int, **filters) -> List[dict]:
+        filters = {key: value for key, value in filters.items() if value is not None}
+        found = []
+        for spin in reversed(self._spins):
+            if all(spin.get(key) == value for key, value in filters.items()):
+                found.append(dict(spin))
+                if len(found) == limit:
+                    break
+        return found
+
+
+class InMemorySpinStatsRepository:
+    """Process-local stand-in for SpinStatsRepository."""
+
+    def __init__(self):
+        self._counts = collections.defaultdict(collections.Counter)
+
+    async def ensure_indexes(self) -> None:
+        pass
+
+    async def increment(self, deltas: Dict[str, Dict[str, int]]) -> None:
+        for kind, counts in deltas.items():
+            self._counts[kind].update(counts)
+
+    async def top(self, kinds, limit: int) -> Dict[str, List[Tuple[str, int]]]:
+        return {kind: self._counts[kind].most_common(limit) for kind in kinds}
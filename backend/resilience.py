@@ -0,0 +1,176 @@
+"""Fail-fast protection and cached health checks for the database."""
+import asyncio
+import functools
+import inspect
+import time
+from contextlib import contextmanager
+from typing import Awaitable, Callable, Optional, Tuple, Type
+
+from pymongo.errors import ConnectionFailure
+
+# Errors that say "the database is unreachable", as opposed to a bad request
+# (duplicate key, validation) which must not trip the breaker.
+UNAVAILABLE_ERRORS: Tuple[Type[BaseException], ...] = (ConnectionFailure, asyncio.TimeoutError)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling the database while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    After ``failure_threshold`` unavailability errors in a row the circuit
+    opens and calls fail immediately with :class:`CircuitOpenError`. After
+    ``reset_timeout`` seconds one trial call is let through (half-open); its
+    outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 10.0,
+                 failure_types: Tuple[Type[BaseException], ...] = UNAVAILABLE_ERRORS):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failure_types = failure_types
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.rejected = 0
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        state = self.state
+        if state == "closed":
+            return
+        if state == "half_open" and not self._trial_in_flight:
+            self._trial_in_flight = True
+            return
+        self.rejected += 1
+        raise CircuitOpenError("Database circuit is open; failing fast")
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self.opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        self._trial_in_flight = False
+        if self.opened_at is not None or self.failures >= self.failure_threshold:
+            self.opened_at = time.monotonic()
+
+    @contextmanager
+    def guard(self):
+        self.before_call()
+        try:
+            yield
+        except self.failure_types:
+            self.record_failure()
+            raise
+        except BaseException:
+            # Not an availability problem, but the trial slot must be freed.
+            self._trial_in_flight = False
+            raise
+        else:
+            self.record_success()
+
+    def stats(self) -> dict:
+        return {"state": self.state, "consecutive_failures": self.failures, "rejected": self.rejected}
+
+
+class GuardedRepository:
+    """Proxy that runs every async method of ``target`` through ``breaker``."""
+
+    def __init__(self, target, breaker: CircuitBreaker):
+        self._target = target
+        self._breaker = breaker
+
+    def __getattr__(self, name):
+        attr = getattr(self._target, name)
+        breaker = self._breaker
+        if inspect.isasyncgenfunction(attr):
+            @functools.wraps(attr)
+            async def guarded_stream(*args, **kwargs):
+                with breaker.guard():
+                    async for item in attr(*args, **kwargs):
+                        yield item
+            return guarded_stream
+        if inspect.iscoroutinefunction(attr):
+            @functools.wraps(attr)
+            async def guarded_call(*args, **kwargs):
+                with breaker.guard():
+                    return await attr(*args, **kwargs)
+            return guarded_call
+        return attr
+
+
+class DependencyProbe:
+    """Runs ``check`` every ``interval`` seconds and caches the outcome.
+
+    Readiness probes read :meth:`status`, so probing costs nothing and a
+    slow dependency cannot pile up probe requests.
+    """
+
+    def __init__(self, name: str, check: Callable[[], Awaitable[None]],
+                 interval: float = 5.0, timeout: float = 2.0,
+                 on_success: Optional[Callable[[], None]] = None):
+        self.name = name
+        self.check = check
+        self.interval = interval
+        self.timeout = timeout
+        self.on_success = on_success
+        self.ok = False
+        self.error: Optional[str] = None
+        self.latency_ms: Optional[float] = None
+        self.checked_at: Optional[float] = None
+        self._task = None
+
+    async def refresh(self) -> None:
+        start = time.perf_counter()
+        try:
+            await asyncio.wait_for(self.check(), timeout=self.timeout)
+        except Exception as e:
+            self.ok = False
+            self.error = str(e) or type(e).__name__
+        else:
+            self.ok = True
+            self.error = None
+            if self.on_success is not None:
+                self.on_success()
+        self.latency_ms = (time.perf_counter() - start) * 1000
+        self.checked_at = time.monotonic()
+
+    def status(self) -> dict:
+        age = None if self.checked_at is None else time.monotonic() - self.checked_at
+        # A result older than a few intervals means the probe loop is stuck.
+        fresh = age is not None and age < 3 * self.interval + self.timeout
+        return {
+            "ok": self.ok and fresh,
+            "error": self.error if fresh else "No recent check",
+            "latency_ms": self.latency_ms,
+            "checked_seconds_ago": age,
+        }
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def close(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval)
@@ -0,0 +1,90 @@
+"""Weighted sampling for the wheel."""
+import math
+import random
+from collections import OrderedDict
+from typing import Hashable, List, Optional, Sequence
+
+
+def validate_weights(weights: Sequence[float], total: int) -> None:
+    """Raise ValueError unless ``weights`` can drive a wheel of ``total`` items."""
+    if len(weights) != total:
+        raise ValueError("Weights must have one entry per food item")
+    if any(not math.isfinite(w) or w < 0 for w in weights):
+        raise ValueError("Weights must be finite and non-negative")
+    if not any(weights):
+        raise ValueError("At least one weight must be positive")
+
+
+class AliasTable:
+    """Walker/Vose alias table: O(n) to build, O(1) per draw."""
+
+    __slots__ = ("n", "prob", "alias")
+
+    def __init__(self, weights: Sequence[float]):
+        n = len(weights)
+        # Normalise by the largest weight first: the raw sum can overflow
+        # near the float maximum, and a subnormal sum overflows the scale.
+        peak = max(weights)
+        normalized = [w / peak for w in weights]
+        scale = n / math.fsum(normalized)
+        scaled = [w * scale for w in normalized]
+        prob = [1.0] * n
+        alias = list(range(n))
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+        while small and large:
+            s = small.pop()
+            l = large.pop()
+            prob[s] = scaled[s]
+            alias[s] = l
+            scaled[l] -= 1.0 - scaled[s]
+            (small if scaled[l] < 1.0 else large).append(l)
+        # Whatever is left over is 1.0 up to rounding error.
+        self.n = n
+        self.prob = prob
+        self.alias = alias
+
+    def draw(self, rng: random.Random = random) -> int:
+        # One uniform variate picks the column (integer part) and the coin
+        # flip within it (fractional part).
+        u = rng.random() * self.n
+        i = int(u)
+        return i if u - i < self.prob[i] else self.alias[i]
+
+    def draw_many(self, k: int, rng: random.Random = random) -> List[int]:
+        n, prob, alias, rand = self.n, self.prob, self.alias, rng.random
+        out = []
+        append = out.append
+        for _ in range(k):
+            u = rand() * n
+            i = int(u)
+            append(i if u - i < prob[i] else alias[i])
+        return out
+
+
+class AliasTableCache:
+    """Bounded LRU of alias tables so a list's table is built only once."""
+
+    def __init__(self, maxsize: int = 256):
+        self.maxsize = maxsize
+        self._tables: "OrderedDict[Hashable, AliasTable]" = OrderedDict()
+
+    def get(self, weights: Sequence[float], key: Optional[Hashable] = None) -> AliasTable:
+        """Table for ``weights``, cached under ``key`` (default: the weights)."""
+        if key is None:
+            key = tuple(weights)
+        table = self._tables.get(key)
+        if table is not None:
+            self._tables.move_to_end(key)
+            return table
+        table = AliasTable(weights)
+        self._tables[key] = table
+        if len(self._tables) > self.maxsize:
+            self._tables.popitem(last=False)
+        return table
+
+    def invalidate(self, key: Hashable) -> None:
+        self._tables.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._tables)
@@ -0,0 +1,100 @@
+"""In-memory prefix index for food item autocomplete."""
+import bisect
+import heapq
+import unicodedata
+from typing import Iterable, List
+
+
+def normalize(text: str) -> str:
+    """Casefolded words with emoji, punctuation and accents removed.
+
+    "Crème Brûlée 🍮" and "creme brulee" both normalize to "creme brulee".
+    """
+    decomposed = unicodedata.normalize("NFKD", text)
+    kept = "".join(
+        char for char in decomposed
+        if unicodedata.category(char)[0] in "LN" or char.isspace()
+    )
+    return " ".join(kept.casefold().split())
+
+
+class FoodSearchIndex:
+    """Sorted array of normalized keys searched with bisect.
+
+    Every item is indexed once per word, so "carb" finds "Spaghetti
+    Carbonara"; matches at the start of the name rank first, then items
+    that appear in more lists. A lookup is a binary search plus a scan of at
+    most ``max_scan`` neighbouring keys, independent of the catalog size.
+
+    Memory is bounded too: only the first ``max_key_length`` characters of
+    a name are indexed, so a long name adds a handful of short keys rather
+    than one key per word of quadratic total length, and past ``max_items``
+    distinct items new ones are no longer indexed (those already in keep
+    counting). Pre-made items are added first, so they are always found.
+    """
+
+    def __init__(self, max_scan: int = 500, max_items: int = 100_000, max_key_length: int = 48):
+        self.max_scan = max_scan
+        self.max_items = max_items
+        self.max_key_length = max_key_length
+        self._entries: List[tuple] = []  # (key, word_position, item_id), sorted
+        self._names: List[str] = []
+        self._counts: List[int] = []
+        self._ids = {}
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def _new_entries(self, name: str) -> List[tuple]:
+        """Count ``name`` and return the index entries it needs if it is new."""
+        key = normalize(name)
+        if not key:
+            return []
+        item_id = self._ids.get(key)
+        if item_id is not None:
+            self._counts[item_id] += 1
+            return []
+        if len(self._names) >= self.max_items:
+            return []
+        item_id = self._ids[key] = len(self._names)
+        self._names.append(name)
+        self._counts.append(1)
+        words = key[:self.max_key_length].split(" ")
+        return [(" ".join(words[i:]), i, item_id) for i in range(len(words))]
+
+    def add(self, name: str) -> None:
+        for entry in self._new_entries(name):
+            bisect.insort(self._entries, entry)
+
+    def add_many(self, names: Iterable[str]) -> None:
+        """Bulk insert; one merge instead of an insort per entry."""
+        new = [entry for name in names for entry in self._new_entries(name)]
+        if not new:
+            return
+        if len(new) < 64:
+            for entry in new:
+                bisect.insort(self._entries, entry)
+            return
+        new.sort()
+        self._entries.extend(new)
+        self._entries.sort()  # two sorted runs: timsort merges them in O(n)
+
+    def search(self, query: str, limit: int = 10) -> List[dict]:
+        prefix = normalize(query)
+        if not prefix:
+            return []
+        entries = self._entries
+        best = {}
+        i = bisect.bisect_left(entries, (prefix,))
+        end = min(len(entries), i + self.max_scan)
+        while i < end:
+            key, position, item_id = entries[i]
+            if not key.startswith(prefix):
+                break
+            rank = 0 if position == 0 else 1
+            if rank < best.get(item_id, 2):
+                best[item_id] = rank
+            i += 1
+        counts, names = self._counts, self._names
+        ranked = heapq.nsmallest(limit, best, key=lambda item_id: (best[item_id], -counts[item_id], names[item_id]))
+        return [{"name": names[item_id], "lists": counts[item_id]} for item_id in ranked]
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Production entry point: serve the API from several worker processes.
+
+Each worker imports the app on its own and opens its MongoDB client in the
+lifespan startup hook, so no client (or its monitor threads) is shared
+across the fork. MONGO_MAX_POOL_SIZE caps connections per worker, so the
+total against Mongo is roughly workers x pool size.
+
+    python serve.py --workers 4 --port 8001
+"""
+import argparse
+import os
+
+import uvicorn
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def main(argv=None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"))
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", "8001")))
+    parser.add_argument("--workers", type=int,
+                        default=int(os.environ.get("WEB_CONCURRENCY", os.cpu_count() or 1)))
+    parser.add_argument("--log-level", default=os.environ.get("LOG_LEVEL", "info"))
+    # Open event streams never finish on their own; cut them off after this
+    # long so shutdown (and the spin-history drain after it) can proceed.
+    parser.add_argument("--graceful-timeout", type=float,
+                        default=float(os.environ.get("GRACEFUL_TIMEOUT", "10")))
+    args = parser.parse_args(argv)
+
+    uvicorn.run(
+        "server:app",
+        app_dir=BACKEND_DIR,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        lifespan="on",
+        log_level=args.log_level,
+        access_log=False,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+
+
+if __name__ == "__main__":
+    main()
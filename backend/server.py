@@ -1,17 +1,80 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request, WebSocket
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-from pymongo import MongoClient
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from contextlib import asynccontextmanager
+from typing import List, Literal, Optional
+import asyncio
+import json
 import os
 import random
-import uuid
 from datetime import datetime
 from dotenv import load_dotenv
 
+from bulk_import import ImportReport, RowError, build_custom_list, iter_rows
+from cache import TTLCache
+from compression import CompressionMiddleware
+from events import Broadcaster, ChangeStreamRelay, SubscriberLagged, SubscriptionClosed
+from history import WriteBehindBuffer
+from limits import InvalidPayload, ItemLimits, PayloadTooLarge
+from metrics import MetricsMiddleware, MetricsRegistry
+from payloads import StaticPayload
+from popularity import PopularityStats
+from profiling import ProfilingMiddleware, RequestProfiler
+from repository import content_id, decode_cursor, encode_cursor
+from resilience import CircuitBreaker, DependencyProbe, GuardedRepository
+from sampling import AliasTableCache, validate_weights
+from search import FoodSearchIndex
+from sessions import SessionStore, ShuffleBag
+from wheel import WheelLayoutCache, items_key, stop_angle
+from storage import create_storage
+
 load_dotenv()
 
-app = FastAPI(title="Food Roulette API")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await storage.open()
+    storage_probe.start()
+
+    # Build indexes in the background so an unreachable store cannot hold up
+    # startup; the server works without them, just with slower lookups.
+    index_task = asyncio.create_task(_ensure_indexes())
+    food_index_task = asyncio.create_task(_index_custom_list_items())
+    spin_history.start()
+    popularity.start()
+    if FEED_FROM_CHANGE_STREAM:
+        list_feed_relay.start()
+    yield
+    index_task.cancel()
+    food_index_task.cancel()
+    list_feed.close()
+    await list_feed_relay.close()
+    await spin_history.close()
+    await popularity.close()
+    await storage_probe.close()
+    await storage.close()
+
+async def _ensure_indexes():
+    try:
+        await custom_lists.ensure_indexes()
+        await spin_records.ensure_indexes()
+        await spin_stats.ensure_indexes()
+    except Exception as e:
+        print(f"MongoDB index creation failed: {e}")
+
+async def _index_custom_list_items(batch_size: int = 5000):
+    try:
+        batch = []
+        async for custom_list in custom_lists.stream():
+            batch.extend(custom_list["items"])
+            if len(batch) >= batch_size:
+                food_index.add_many(batch)
+                batch = []
+        food_index.add_many(batch)
+    except Exception as e:
+        print(f"Food search index build failed: {e}")
+
+app = FastAPI(title="Food Roulette API", lifespan=lifespan)
 
 # CORS middleware
 app.add_middleware(
@@ -22,10 +85,147 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# MongoDB connection
+# Opt-in request profiling: a PROFILE_SAMPLE_RATE fraction of requests, plus
+# any request with an X-Profile header signed with PROFILE_SECRET
+profiler = RequestProfiler(
+    os.environ.get('PROFILE_DIR', 'profiles'),
+    sample_rate=float(os.environ.get('PROFILE_SAMPLE_RATE', '0')),
+    secret=os.environ.get('PROFILE_SECRET'),
+    keep=int(os.environ.get('PROFILE_KEEP', '100')),
+)
+app.add_middleware(ProfilingMiddleware, profiler=profiler)
+
+# Compress JSON responses of at least COMPRESSION_MIN_SIZE bytes
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', '500'))
+app.add_middleware(CompressionMiddleware, minimum_size=COMPRESSION_MIN_SIZE)
+
+# Request/DB latency metrics, served on /api/metrics
+metrics = MetricsRegistry()
+app.add_middleware(MetricsMiddleware, registry=metrics)
+
+# Storage backend (mongo, sqlite or memory), opened per process by the
+# lifespan hook
+STORAGE_BACKEND = os.environ.get('STORAGE_BACKEND', 'mongo')
 MONGO_URL = os.environ.get('MONGO_URL')
-client = MongoClient(MONGO_URL)
-db = client.food_roulette
+MONGO_DATABASE = os.environ.get('MONGO_DATABASE', 'food_roulette')
+MONGO_MAX_POOL_SIZE = int(os.environ.get('MONGO_MAX_POOL_SIZE', '100'))
+MONGO_TIMEOUT_MS = int(os.environ.get('MONGO_TIMEOUT_MS', '5000'))
+SQLITE_PATH = os.environ.get('SQLITE_PATH', 'food_roulette.db')
+storage = create_storage(
+    STORAGE_BACKEND,
+    mongo_url=MONGO_URL,
+    mongo_database=MONGO_DATABASE,
+    mongo_max_pool_size=MONGO_MAX_POOL_SIZE,
+    mongo_timeout_ms=MONGO_TIMEOUT_MS,
+    sqlite_path=SQLITE_PATH,
+)
+
+# After repeated connection failures, data-layer calls to any storage backend
+# fail fast instead of each waiting out the server-selection timeout. The
+# MONGO_BREAKER_* names predate the other backends and are still read.
+storage_breaker = CircuitBreaker(
+    failure_threshold=int(os.environ.get(
+        'STORAGE_BREAKER_FAILURES', os.environ.get('MONGO_BREAKER_FAILURES', '5'))),
+    reset_timeout=float(os.environ.get(
+        'STORAGE_BREAKER_RESET_SECONDS', os.environ.get('MONGO_BREAKER_RESET_SECONDS', '10'))),
+)
+custom_lists = GuardedRepository(storage.custom_lists, storage_breaker)
+spin_records = GuardedRepository(storage.spin_history, storage_breaker)
+spin_stats = GuardedRepository(storage.spin_stats, storage_breaker)
+
+# Readiness reads a cached ping instead of hitting storage on every probe.
+# The probe outlasts the Mongo server-selection timeout, so a failed check
+# reports the driver's error rather than a bare TimeoutError.
+storage_probe = DependencyProbe(
+    storage.name,
+    storage.ping,
+    interval=float(os.environ.get('READINESS_INTERVAL_SECONDS', '5')),
+    timeout=MONGO_TIMEOUT_MS / 1000 + 1,
+    on_success=storage_breaker.record_success,
+)
+
+# Spin-by-id cache of stored custom lists
+LIST_CACHE_SIZE = int(os.environ.get('LIST_CACHE_SIZE', '1024'))
+LIST_CACHE_TTL = float(os.environ.get('LIST_CACHE_TTL', '300'))
+list_cache = TTLCache(maxsize=LIST_CACHE_SIZE, ttl=LIST_CACHE_TTL)
+
+# Live feed of new custom lists. With LIST_FEED_CHANGE_STREAM on the mongo
+# storage backend the feed is driven by a Mongo change stream (needs a
+# replica set), so subscribers see lists created by every worker; otherwise
+# each process publishes the lists it creates itself.
+LIST_FEED_QUEUE = int(os.environ.get('LIST_FEED_QUEUE', '256'))
+LIST_FEED_MAX_SUBSCRIBERS = int(os.environ.get('LIST_FEED_MAX_SUBSCRIBERS', '1000'))
+LIST_FEED_HEARTBEAT_SECONDS = float(os.environ.get('LIST_FEED_HEARTBEAT_SECONDS', '15'))
+LIST_FEED_CHANGE_STREAM = os.environ.get('LIST_FEED_CHANGE_STREAM', 'false').lower() in ('1', 'true', 'yes')
+FEED_FROM_CHANGE_STREAM = LIST_FEED_CHANGE_STREAM and storage.name == "mongo"
+list_feed = Broadcaster(max_queue=LIST_FEED_QUEUE, max_subscribers=LIST_FEED_MAX_SUBSCRIBERS)
+
+def _watch_custom_lists(resume_after):
+    # Not through the breaker: a stream held open for hours would keep the
+    # half-open trial slot to itself.
+    return storage.custom_lists.watch(resume_after)
+
+list_feed_relay = ChangeStreamRelay(_watch_custom_lists, list_feed.publish)
+
+def _publish_list(custom_list: dict):
+    if not FEED_FROM_CHANGE_STREAM:
+        list_feed.publish(custom_list)
+
+# Spin history is written behind the response in batches
+SPIN_HISTORY_BATCH = int(os.environ.get('SPIN_HISTORY_BATCH', '500'))
+SPIN_HISTORY_FLUSH_MS = int(os.environ.get('SPIN_HISTORY_FLUSH_MS', '250'))
+SPIN_HISTORY_MAX_PENDING = int(os.environ.get('SPIN_HISTORY_MAX_PENDING', '10000'))
+MAX_HISTORY_PAGE = 500
+
+async def _write_spin_history(spins):
+    with metrics.time_db("insert_many", collection="spin_history"):
+        await spin_records.insert_many(spins)
+
+spin_history = WriteBehindBuffer(
+    _write_spin_history,
+    max_batch=SPIN_HISTORY_BATCH,
+    flush_interval=SPIN_HISTORY_FLUSH_MS / 1000,
+    max_pending=SPIN_HISTORY_MAX_PENDING,
+)
+
+# Leaderboards: counters kept in memory, folded into spin_stats periodically
+STATS_CAPACITY = int(os.environ.get('STATS_CAPACITY', '1000'))
+STATS_FOLD_SECONDS = float(os.environ.get('STATS_FOLD_SECONDS', '30'))
+MAX_STATS_TOP = 100
+popularity = PopularityStats(spin_stats, capacity=STATS_CAPACITY, fold_interval=STATS_FOLD_SECONDS)
+
+# Upper bound on draws per POST /api/spin/batch
+MAX_BATCH_SPINS = 100_000
+
+# Bounds on the item lists clients send to spin or store. The body limit
+# applies to the bare-array bodies of POST /api/spin and /api/custom-lists,
+# which are capped as they stream in.
+MAX_ITEMS_BODY_BYTES = int(os.environ.get('MAX_ITEMS_BODY_BYTES', str(1 << 20)))
+MAX_LIST_ITEMS = int(os.environ.get('MAX_LIST_ITEMS', '10000'))
+MAX_ITEM_LENGTH = int(os.environ.get('MAX_ITEM_LENGTH', '200'))
+item_limits = ItemLimits(MAX_ITEMS_BODY_BYTES, MAX_LIST_ITEMS, MAX_ITEM_LENGTH)
+# Documents the body those endpoints read by hand
+ITEM_LIST_BODY = {"requestBody": {"required": True, "content": {"application/json": {"schema": {
+    "type": "array", "items": {"type": "string", "maxLength": MAX_ITEM_LENGTH}, "maxItems": MAX_LIST_ITEMS,
+}}}}}
+
+# Upper bound on spins per message on the kiosk WebSocket channel
+WS_MAX_SPINS = int(os.environ.get('WS_MAX_SPINS', '1000'))
+
+# No-repeat spin sessions. They live in the worker that created them, so with
+# several workers clients need sticky routing (or the WebSocket channel's
+# no_repeat option) and should start a new session on a 404.
+SPIN_SESSION_MAX = int(os.environ.get('SPIN_SESSION_MAX', '100000'))
+SPIN_SESSION_IDLE_SECONDS = float(os.environ.get('SPIN_SESSION_IDLE_SECONDS', '900'))
+spin_sessions = SessionStore(maxsize=SPIN_SESSION_MAX, idle_ttl=SPIN_SESSION_IDLE_SECONDS)
+
+# Bulk import: documents per upsert batch and errors kept in the report
+IMPORT_BATCH_SIZE = 1000
+IMPORT_MAX_ERRORS = 1000
+
+# Pagination for GET /api/custom-lists
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
 
 # Data Models
 class FoodItem(BaseModel):
@@ -38,6 +238,7 @@ class CustomFoodList(BaseModel):
     id: str
     name: str
     items: List[str]
+    weights: Optional[List[float]] = None
     created_at: str
 
 class SpinResult(BaseModel):
@@ -45,6 +246,25 @@ class SpinResult(BaseModel):
     theme: dict
     timestamp: str
 
+class WeightedSpinRequest(BaseModel):
+    food_items: List[str]
+    weights: List[float]
+
+class BatchSpinRequest(BaseModel):
+    food_items: List[str]
+    count: int = Field(ge=1, le=MAX_BATCH_SPINS)
+    replace: bool = True
+    weights: Optional[List[float]] = None
+
+class SpinSessionRequest(BaseModel):
+    food_items: Optional[List[str]] = None
+    category: Optional[str] = None
+    list_id: Optional[str] = None
+
+class WheelSpinRequest(SpinSessionRequest):
+    theme_id: Optional[str] = None
+    layout: Literal["segments", "svg", "none"] = "segments"
+
 # Pre-made food lists by category
 PREMADE_LISTS = {
     "italian": {
@@ -112,56 +332,254 @@ THEMES = [
     }
 ]
 
+# The catalogs never change while the process runs, so encode them once.
+PREMADE_LISTS_PAYLOAD = StaticPayload({"lists": PREMADE_LISTS})
+PREMADE_LIST_PAYLOADS = {category: StaticPayload(details) for category, details in PREMADE_LISTS.items()}
+THEMES_PAYLOAD = StaticPayload({"themes": THEMES})
+THEME_IDS = [theme["id"] for theme in THEMES]
+THEMES_BY_ID = {theme["id"]: theme for theme in THEMES}
+# Shared by every spin session over a category
+PREMADE_SOURCES = {category: {"category": category} for category in PREMADE_LISTS}
+
+# Autocomplete over every known food item; custom lists are added at startup
+# and as they are created, up to FOOD_INDEX_MAX_ITEMS distinct items
+MAX_SEARCH_RESULTS = 50
+FOOD_INDEX_MAX_ITEMS = int(os.environ.get('FOOD_INDEX_MAX_ITEMS', '100000'))
+food_index = FoodSearchIndex(max_items=FOOD_INDEX_MAX_ITEMS)
+food_index.add_many(item for details in PREMADE_LISTS.values() for item in details["items"])
+
+# Alias tables for weighted spins, reused across spins of the same wheel
+alias_tables = AliasTableCache()
+
+# Segment paths and SVG per (wheel content, theme), for /api/wheel; the cache
+# is bounded by entries and by segments summed over all entries
+WHEEL_CACHE_SIZE = int(os.environ.get('WHEEL_CACHE_SIZE', '256'))
+WHEEL_CACHE_SEGMENTS = int(os.environ.get('WHEEL_CACHE_SEGMENTS', '20000'))
+wheel_layouts = WheelLayoutCache(maxsize=WHEEL_CACHE_SIZE, max_segments=WHEEL_CACHE_SEGMENTS)
+
+# Largest wheel a layout is drawn for; at 360 segments each is one degree wide.
+# Bigger wheels can still be spun with layout="none".
+WHEEL_MAX_SEGMENTS = int(os.environ.get('WHEEL_MAX_SEGMENTS', '360'))
+
 @app.get("/api/health")
 async def health_check():
     return {"status": "healthy", "message": "Food Roulette API is running!"}
 
+@app.get("/api/ready")
+async def readiness_check():
+    """Readiness: healthy only while the cached storage ping succeeds"""
+    check = storage_probe.status()
+    body = {
+        "status": "ready" if check["ok"] else "not_ready",
+        "checks": {storage.name: check},
+        "circuit": storage_breaker.stats(),
+    }
+    return JSONResponse(body, status_code=200 if check["ok"] else 503)
+
 @app.get("/api/premade-lists")
-async def get_premade_lists():
+async def get_premade_lists(request: Request):
     """Get all available pre-made food lists"""
-    return {"lists": PREMADE_LISTS}
+    return PREMADE_LISTS_PAYLOAD.response(request)
 
 @app.get("/api/premade-lists/{category}")
-async def get_premade_list(category: str):
+async def get_premade_list(category: str, request: Request):
     """Get a specific pre-made food list"""
     if category not in PREMADE_LISTS:
         raise HTTPException(status_code=404, detail="Category not found")
-    return PREMADE_LISTS[category]
+    return PREMADE_LIST_PAYLOADS[category].response(request)
 
-@app.post("/api/custom-lists")
-async def create_custom_list(name: str, items: List[str]):
-    """Create a custom food list"""
+@app.post("/api/custom-lists", openapi_extra=ITEM_LIST_BODY)
+async def create_custom_list(request: Request, name: str, weights: Optional[List[float]] = Query(None)):
+    """Create a custom food list, optionally with one weight per item"""
+    items = await _read_items(request)
     if not items:
         raise HTTPException(status_code=400, detail="Items list cannot be empty")
+    if weights is not None:
+        try:
+            validate_weights(weights, len(items))
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
     
+    # Keyed by content, so resubmitting a list returns the stored original.
     custom_list = {
-        "id": str(uuid.uuid4()),
+        "id": content_id(name, items, weights),
         "name": name,
         "items": items,
         "created_at": str(datetime.now())
     }
+    if weights is not None:
+        custom_list["weights"] = weights
     
     # Store in MongoDB (optional for persistence)
     try:
-        db.custom_lists.insert_one(custom_list)
+        with metrics.time_db("upsert"):
+            custom_list, created = await custom_lists.upsert(custom_list)
+        list_cache.set(custom_list["id"], custom_list)
+        if created:
+            food_index.add_many(items)
+            _publish_list(custom_list)
     except Exception as e:
         print(f"MongoDB insert failed: {e}")
     
     return custom_list
 
+@app.post("/api/custom-lists/import")
+async def import_custom_lists(request: Request):
+    """Bulk-create custom lists from a JSON array or NDJSON body.
+
+    Rows are parsed and validated as the body streams in and written in
+    unordered batches; bad rows are reported instead of failing the import.
+    """
+    ndjson = "ndjson" in request.headers.get("content-type", "")
+    report = ImportReport(max_errors=IMPORT_MAX_ERRORS)
+    batch = []
+
+    async for row, value in iter_rows(request.stream(), ndjson, item_limits.max_body_bytes):
+        try:
+            batch.append((row, build_custom_list(value, item_limits)))
+        except RowError as e:
+            report.error(row, str(e))
+            continue
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await _import_batch(batch, report)
+            batch = []
+    if batch:
+        await _import_batch(batch, report)
+
+    return report.as_dict()
+
+async def _import_batch(batch, report: ImportReport):
+    rows = [row for row, _ in batch]
+    docs = [doc for _, doc in batch]
+    try:
+        with metrics.time_db("upsert_many"):
+            failures, created = await custom_lists.upsert_many(docs)
+    except Exception as e:
+        print(f"MongoDB insert failed: {e}")
+        failures, created = [(index, f"Insert failed: {e}") for index in range(len(docs))], []
+    for index, message in failures:
+        report.error(rows[index], message)
+    report.imported += len(created)
+    report.duplicates += len(docs) - len(failures) - len(created)
+    food_index.add_many(item for index in created for item in docs[index]["items"])
+    for index in created:
+        _publish_list(docs[index])
+
 @app.get("/api/custom-lists")
-async def get_custom_lists():
-    """Get all custom food lists"""
+async def get_custom_lists(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    format: str = Query("json", pattern="^(json|ndjson)$"),
+):
+    """Get custom food lists, oldest first, one keyset page at a time.
+
+    ``format=ndjson`` streams one list per line straight off the Mongo cursor
+    instead of building a page; ``limit`` is then optional.
+    """
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if format == "ndjson":
+        return StreamingResponse(_ndjson_lists(after, limit), media_type="application/x-ndjson")
+
     try:
-        lists = list(db.custom_lists.find({}, {"_id": 0}))
-        return {"lists": lists}
+        with metrics.time_db("find_page"):
+            lists, next_cursor = await custom_lists.page(limit or DEFAULT_PAGE_SIZE, after)
+        return {"lists": lists, "next_cursor": next_cursor}
     except Exception as e:
         print(f"MongoDB query failed: {e}")
-        return {"lists": []}
+        return {"lists": [], "next_cursor": None}
+
+@app.get("/api/custom-lists/events")
+async def custom_list_events(request: Request, after: Optional[str] = None):
+    """Server-sent events: one ``list`` event per custom list created.
+
+    Event ids are list cursors. A reconnecting client's Last-Event-ID (or
+    ``after``) first replays the lists it missed, then the live feed follows.
+    """
+    cursor = request.headers.get("last-event-id") or after
+    try:
+        position = decode_cursor(cursor) if cursor else None
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    try:
+        subscription = list_feed.subscribe()
+    except OverflowError:
+        raise HTTPException(status_code=503, detail="Too many feed subscribers")
+    return StreamingResponse(
+        _list_events(subscription, position),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
-@app.post("/api/spin")
-async def spin_wheel(food_items: List[str]):
+def _sse(custom_list: dict) -> bytes:
+    data = json.dumps(custom_list, ensure_ascii=False)
+    return f"id: {encode_cursor(custom_list)}\nevent: list\ndata: {data}\n\n".encode()
+
+async def _list_events(subscription, position):
+    with subscription:
+        replayed = set()
+        if position is not None:
+            try:
+                async for doc in custom_lists.stream(position):
+                    replayed.add(doc["id"])
+                    yield _sse(doc)
+            except Exception as e:
+                print(f"MongoDB query failed: {e}")
+        # Lists created during the replay are both replayed and queued.
+        backlog = subscription.queue.qsize() if replayed else 0
+        while True:
+            try:
+                doc = await subscription.get(timeout=LIST_FEED_HEARTBEAT_SECONDS)
+            except SubscriberLagged:
+                # Tell the client to reconnect from its last event id.
+                yield b"event: lagged\ndata: {}\n\n"
+                return
+            except SubscriptionClosed:
+                return
+            if doc is None:
+                yield b": keep-alive\n\n"
+                continue
+            if backlog:
+                backlog -= 1
+                if doc["id"] in replayed:
+                    continue
+            yield _sse(doc)
+
+@app.get("/api/custom-lists/{list_id}")
+async def get_custom_list(list_id: str):
+    """Get one custom food list by id"""
+    return await _load_custom_list(list_id)
+
+async def _load_custom_list(list_id: str) -> dict:
+    custom_list = list_cache.get(list_id)
+    if custom_list is None:
+        try:
+            with metrics.time_db("find_one"):
+                custom_list = await custom_lists.get(list_id)
+        except Exception as e:
+            print(f"MongoDB query failed: {e}")
+            raise HTTPException(status_code=503, detail="Custom lists are unavailable")
+        if custom_list is None:
+            raise HTTPException(status_code=404, detail="Custom list not found")
+        list_cache.set(list_id, custom_list)
+    return custom_list
+
+async def _ndjson_lists(after, limit):
+    try:
+        with metrics.time_db("find_stream"):
+            async for doc in custom_lists.stream(after, limit):
+                yield (json.dumps(doc, ensure_ascii=False) + "\n").encode()
+    except Exception as e:
+        # Headers are already sent, so the stream just ends early.
+        print(f"MongoDB query failed: {e}")
+
+@app.post("/api/spin", openapi_extra=ITEM_LIST_BODY)
+async def spin_wheel(request: Request):
     """Spin the wheel and get a random food selection with theme"""
+    food_items = await _read_items(request)
     if not food_items:
         raise HTTPException(status_code=400, detail="No food items provided")
     
@@ -178,13 +596,431 @@ async def spin_wheel(food_items: List[str]):
         "timestamp": str(datetime.now()),
         "total_options": len(food_items)
     }
+    await _record_spin(result)
     
     return result
 
+async def _read_items(request: Request) -> List[str]:
+    """The JSON array of item names in the body, within ``item_limits``."""
+    try:
+        body = await item_limits.read(request.stream(), request.headers.get("content-length"))
+        return item_limits.parse(body)
+    except PayloadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidPayload as e:
+        raise HTTPException(status_code=422, detail=str(e))
+
+def _check_items(items: List[str]):
+    try:
+        item_limits.check(items)
+    except PayloadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+
+@app.post("/api/spin/weighted")
+async def spin_wheel_weighted(spin: WeightedSpinRequest):
+    """Spin a wheel whose segments have different odds"""
+    if not spin.food_items:
+        raise HTTPException(status_code=400, detail="No food items provided")
+    _check_items(spin.food_items)
+    try:
+        validate_weights(spin.weights, len(spin.food_items))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    table = alias_tables.get(spin.weights)
+
+    result = {
+        "selected_food": spin.food_items[table.draw()],
+        "theme": random.choice(THEMES),
+        "timestamp": str(datetime.now()),
+        "total_options": len(spin.food_items)
+    }
+    await _record_spin(result)
+    return result
+
+@app.post("/api/spin/batch")
+async def spin_wheel_batch(spin: BatchSpinRequest):
+    """Draw many results in one request.
+
+    Selections come back as indices into ``food_items`` and themes as ids
+    (see /api/themes) to keep the response compact.
+    """
+    total = len(spin.food_items)
+    if not total:
+        raise HTTPException(status_code=400, detail="No food items provided")
+    _check_items(spin.food_items)
+    if not spin.replace and spin.count > total:
+        raise HTTPException(status_code=400, detail="Count exceeds number of food items when drawing without replacement")
+    if spin.weights is not None:
+        if not spin.replace:
+            raise HTTPException(status_code=400, detail="Weighted spins are only supported with replacement")
+        try:
+            validate_weights(spin.weights, total)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+    # choices/sample draw the whole batch in C rather than one call per spin
+    if spin.weights is not None:
+        indices = alias_tables.get(spin.weights).draw_many(spin.count)
+    elif spin.replace:
+        indices = random.choices(range(total), k=spin.count)
+    else:
+        indices = random.sample(range(total), spin.count)
+
+    return {
+        "indices": indices,
+        "theme_ids": random.choices(THEME_IDS, k=spin.count),
+        "timestamp": str(datetime.now()),
+        "total_options": total
+    }
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def get_metrics():
+    """Prometheus text exposition of request, DB and cache metrics"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+def _gauge_samples():
+    yield "storage_circuit_open", "gauge", "1 while the storage circuit breaker is failing fast.", int(storage_breaker.state == "open")
+    yield "storage_ready", "gauge", "1 while the cached storage ping succeeds.", int(storage_probe.status()["ok"])
+    stats = list_cache.stats()
+    yield "list_cache_hits_total", "counter", "Spin/lookup hits in the custom-list cache.", stats["hits"]
+    yield "list_cache_misses_total", "counter", "Spin/lookup misses in the custom-list cache.", stats["misses"]
+    yield "list_cache_entries", "gauge", "Custom lists currently cached.", stats["size"]
+    layouts = wheel_layouts.stats()
+    yield "wheel_layout_cache_hits_total", "counter", "Wheel layouts served from cache.", layouts["hits"]
+    yield "wheel_layout_cache_misses_total", "counter", "Wheel layouts computed on a cache miss.", layouts["misses"]
+    yield "wheel_layout_cache_entries", "gauge", "Wheel layouts currently cached.", layouts["size"]
+    sessions = spin_sessions.stats()
+    yield "spin_sessions", "gauge", "Open no-repeat spin sessions.", sessions["size"]
+    yield "spin_sessions_expired_total", "counter", "Spin sessions dropped after sitting idle.", sessions["expired"]
+    yield "spin_sessions_evicted_total", "counter", "Spin sessions evicted to stay within SPIN_SESSION_MAX.", sessions["evicted"]
+    feed = list_feed.stats()
+    yield "list_feed_subscribers", "gauge", "Open custom-list event streams.", feed["subscribers"]
+    yield "list_feed_dropped_total", "counter", "Feed subscribers dropped for falling behind.", feed["dropped"]
+
+metrics.add_collector(_gauge_samples)
+
+@app.get("/api/profiles")
+async def get_profiles(limit: int = Query(20, ge=1, le=100)):
+    """Most expensive recently profiled requests, slowest first"""
+    if not profiler.enabled:
+        raise HTTPException(status_code=404, detail="Profiling is disabled")
+    return {
+        "profiles": profiler.slowest(limit),
+        "profiled": profiler.profiled,
+        "sample_rate": profiler.sample_rate,
+    }
+
+@app.get("/api/cache/stats")
+async def get_cache_stats():
+    """Hit/miss counters for the server-side caches"""
+    return {"custom_lists": list_cache.stats(), "wheel_layouts": wheel_layouts.stats()}
+
+@app.post("/api/spin-sessions")
+async def create_spin_session(request: SpinSessionRequest):
+    """Start a no-repeat session over some items, a category or a stored list.
+
+    Each spin of the session draws from a shuffled bag, so every item comes
+    up once before any repeats, and never twice in a row.
+    """
+    items, weights, source, _ = await _resolve_wheel(request)
+    if weights is not None:
+        raise HTTPException(status_code=400, detail="Weighted lists cannot be spun without repeats")
+    session_id, _ = spin_sessions.create(items, source)
+    return {
+        "session_id": session_id,
+        "total_options": len(items),
+        "idle_timeout_seconds": spin_sessions.idle_ttl,
+        **(source or {}),
+    }
+
+async def _resolve_wheel(request: SpinSessionRequest):
+    """(items, weights, source, content key) for the wheel a request names."""
+    if request.category is not None:
+        if request.category not in PREMADE_LISTS:
+            raise HTTPException(status_code=404, detail="Category not found")
+        source = PREMADE_SOURCES[request.category]
+        return PREMADE_LISTS[request.category]["items"], None, source, ("premade", request.category)
+    if request.list_id is not None:
+        custom_list = await _load_custom_list(request.list_id)
+        # Stored list ids are already content hashes
+        source = {"list_id": request.list_id}
+        return custom_list["items"], custom_list.get("weights"), source, ("list", request.list_id)
+    if request.food_items:
+        _check_items(request.food_items)
+        return request.food_items, None, None, ("items", items_key(request.food_items))
+    raise HTTPException(status_code=400, detail="No food items provided")
+
+@app.post("/api/spin-sessions/{session_id}/spin")
+async def spin_session(session_id: str):
+    """Spin the next item out of a session's bag"""
+    session = spin_sessions.get(session_id)
+    if session is None:
+        raise HTTPException(status_code=404, detail="Spin session not found or expired")
+    source = session.source or {}
+    result = {
+        "selected_food": session.items[session.draw()],
+        "theme": random.choice(THEMES),
+        "timestamp": str(datetime.now()),
+        "total_options": len(session),
+        "remaining": session.remaining,
+        "session_id": session_id,
+        **source,
+    }
+    await _record_spin(result, **source)
+    return result
+
+@app.delete("/api/spin-sessions/{session_id}")
+async def close_spin_session(session_id: str):
+    """End a spin session early"""
+    if not spin_sessions.discard(session_id):
+        raise HTTPException(status_code=404, detail="Spin session not found or expired")
+    return {"session_id": session_id, "closed": True}
+
+@app.post("/api/wheel/spin")
+async def spin_wheel_layout(request: WheelSpinRequest):
+    """Spin and get the wheel to draw along with where it should stop.
+
+    ``stop_angle`` is the clockwise rotation, modulo 360, that leaves the
+    selected segment under the pointer. ``layout`` picks what comes with
+    it: the segment paths and colours, a ready-made SVG, or nothing for
+    clients that kept the layout from an earlier spin. Layouts are cached
+    per wheel and theme, so repeated spins of one list skip the geometry;
+    wheels over ``WHEEL_MAX_SEGMENTS`` items only spin with ``"none"``.
+    """
+    items, weights, source, key = await _resolve_wheel(request)
+    theme = _theme(request.theme_id)
+    if weights is None:
+        index = random.randrange(len(items))
+    else:
+        index = alias_tables.get(weights, key).draw()
+    layout = None if request.layout == "none" else _wheel_layout(key, theme, items)
+    result = {
+        "selected_food": items[index],
+        "selected_index": index,
+        "stop_angle": stop_angle(index, len(items)),
+        "theme": theme,
+        "timestamp": str(datetime.now()),
+        "total_options": len(items),
+        **(source or {}),
+    }
+    await _record_spin(result, **(source or {}))
+    # The cached layout is spliced in already encoded
+    body = json.dumps(result, ensure_ascii=False).encode()
+    if request.layout == "segments":
+        body = body[:-1] + b', "segments": ' + layout.json() + b"}"
+    elif request.layout == "svg":
+        body = body[:-1] + b', "svg": ' + layout.svg_json() + b"}"
+    return Response(content=body, media_type="application/json")
+
+@app.get("/api/wheel/layout")
+async def get_wheel_layout(
+    theme_id: str,
+    category: Optional[str] = None,
+    list_id: Optional[str] = None,
+    format: Literal["json", "svg"] = "json",
+):
+    """Wheel layout for a pre-made category or stored list, as segments or SVG"""
+    if category is None and list_id is None:
+        raise HTTPException(status_code=400, detail="Pass a category or a list_id")
+    items, _, _, key = await _resolve_wheel(SpinSessionRequest(category=category, list_id=list_id))
+    layout = _wheel_layout(key, _theme(theme_id), items)
+    if format == "svg":
+        return Response(content=layout.svg(), media_type="image/svg+xml")
+    return Response(content=b'{"segments": ' + layout.json() + b"}", media_type="application/json")
+
+def _wheel_layout(key, theme: dict, items: List[str]):
+    if len(items) > WHEEL_MAX_SEGMENTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Wheels with more than {WHEEL_MAX_SEGMENTS} items have no layout; spin them with layout \"none\"",
+        )
+    return wheel_layouts.get(key, theme, items)
+
+def _theme(theme_id: Optional[str]) -> dict:
+    if theme_id is None:
+        return random.choice(THEMES)
+    if theme_id not in THEMES_BY_ID:
+        raise HTTPException(status_code=404, detail="Theme not found")
+    return THEMES_BY_ID[theme_id]
+
+@app.post("/api/spin/premade/{category}")
+async def spin_premade_list(category: str):
+    """Spin a pre-made list without sending its items"""
+    if category not in PREMADE_LISTS:
+        raise HTTPException(status_code=404, detail="Category not found")
+    result = _spin_items(PREMADE_LISTS[category]["items"])
+    result["category"] = category
+    await _record_spin(result, category=category)
+    return result
+
+@app.post("/api/spin/{list_id}")
+async def spin_custom_list(list_id: str):
+    """Spin a stored custom list without sending its items"""
+    custom_list = await _load_custom_list(list_id)
+    result = _spin_items(custom_list["items"], custom_list.get("weights"), ("list", list_id))
+    result["list_id"] = list_id
+    await _record_spin(result, list_id=list_id)
+    return result
+
+@app.websocket("/api/ws/spin")
+async def spin_channel(websocket: WebSocket):
+    """Persistent spin channel for kiosks.
+
+    Register a wheel once with ``{"op": "register", "items": [...]}``
+    (optionally ``"weights"``), ``{"op": "register", "category": ...}`` or
+    ``{"op": "register", "list_id": ...}``; add ``"no_repeat": true`` to draw
+    from a shuffled bag as spin sessions do. After that a message holding just
+    a spin count, e.g. ``1``, is answered with one ``[item_index, theme_id]``
+    pair per spin. Problems are reported as ``{"error": ...}`` and the
+    connection stays open.
+    """
+    await websocket.accept()
+    wheel = None
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+        text = message.get("text") or (message.get("bytes") or b"").decode("utf-8", "replace")
+        if text.isdecimal():
+            # isdigit() would let "²" through to int(), and int() refuses
+            # thousands of digits; anything this long is out of range anyway.
+            count = int(text) if len(text) <= 9 else 0
+            if wheel is None:
+                error = "Register a wheel first"
+            elif not 1 <= count <= WS_MAX_SPINS:
+                error = f"Spin count must be between 1 and {WS_MAX_SPINS}"
+            else:
+                await websocket.send_text(json.dumps(await _spin_wheel_channel(wheel, count)))
+                continue
+        else:
+            try:
+                wheel = await _register_wheel(text)
+            except (ValueError, TypeError, OverflowError) as e:
+                error = str(e)
+            except HTTPException as e:
+                error = e.detail
+            else:
+                await websocket.send_text(json.dumps(
+                    {"op": "registered", "total_options": len(wheel["items"])}, ensure_ascii=False
+                ))
+                continue
+        await websocket.send_text(json.dumps({"error": error}))
+
+async def _register_wheel(text: str) -> dict:
+    """Validate a channel registration; raises ValueError or HTTPException."""
+    try:
+        request = json.loads(text)
+    except ValueError:
+        request = None
+    if not isinstance(request, dict) or request.get("op") != "register":
+        raise ValueError('Expected {"op": "register", ...} or a spin count')
+    wheel = await _wheel_source(request)
+    wheel["bag"] = None
+    if request.get("no_repeat"):
+        if wheel["table"] is not None:
+            raise ValueError("Weighted wheels cannot be spun without repeats")
+        wheel["bag"] = ShuffleBag(len(wheel["items"]))
+    return wheel
+
+async def _wheel_source(request: dict) -> dict:
+    if "category" in request:
+        category = request["category"]
+        if not isinstance(category, str) or category not in PREMADE_LISTS:
+            raise ValueError("Category not found")
+        return {"items": PREMADE_LISTS[category]["items"], "table": None, "source": {"category": category}}
+    if "list_id" in request:
+        list_id = request["list_id"]
+        if not isinstance(list_id, str):
+            raise ValueError("'list_id' must be a string")
+        custom_list = await _load_custom_list(list_id)
+        weights = custom_list.get("weights")
+        table = alias_tables.get(weights, ("list", list_id)) if weights is not None else None
+        return {"items": custom_list["items"], "table": table, "source": {"list_id": list_id}}
+    items, weights = request.get("items"), request.get("weights")
+    if not isinstance(items, list) or not items or not all(isinstance(item, str) for item in items):
+        raise ValueError("'items' must be a non-empty list of strings")
+    item_limits.check(items)
+    if weights is not None:
+        if not isinstance(weights, list) or not all(
+            isinstance(w, (int, float)) and not isinstance(w, bool) for w in weights
+        ):
+            raise ValueError("'weights' must be a list of numbers")
+        try:
+            # JSON integers are unbounded; one too big for a float is not a weight.
+            weights = [float(w) for w in weights]
+        except OverflowError:
+            raise ValueError("Weights must be finite and non-negative")
+        validate_weights(weights, len(items))
+    return {"items": items, "table": alias_tables.get(weights) if weights is not None else None, "source": {}}
+
+async def _spin_wheel_channel(wheel: dict, count: int) -> list:
+    items = wheel["items"]
+    if wheel["bag"] is not None:
+        indices = wheel["bag"].draw_many(count)
+    elif wheel["table"] is not None:
+        indices = wheel["table"].draw_many(count)
+    else:
+        indices = random.choices(range(len(items)), k=count)
+    theme_ids = random.choices(THEME_IDS, k=count)
+    timestamp = str(datetime.now())
+    for index, theme_id in zip(indices, theme_ids):
+        await _record_draw(items[index], theme_id, timestamp, **wheel["source"])
+    return [[index, theme_id] for index, theme_id in zip(indices, theme_ids)]
+
+def _spin_items(items, weights=None, table_key=None):
+    if weights is None:
+        selected_food = random.choice(items)
+    else:
+        selected_food = items[alias_tables.get(weights, table_key).draw()]
+    return {
+        "selected_food": selected_food,
+        "theme": random.choice(THEMES),
+        "timestamp": str(datetime.now()),
+        "total_options": len(items)
+    }
+
+async def _record_spin(result: dict, **source):
+    await _record_draw(result["selected_food"], result["theme"]["id"], result["timestamp"], **source)
+
+async def _record_draw(food: str, theme_id: str, timestamp: str, **source):
+    popularity.record(food, theme_id, source.get("category"))
+    await spin_history.put({
+        "selected_food": food,
+        "theme_id": theme_id,
+        "timestamp": timestamp,
+        **source,
+    })
+
+@app.get("/api/spin-history")
+async def get_spin_history(
+    limit: int = Query(50, ge=1, le=MAX_HISTORY_PAGE),
+    list_id: Optional[str] = None,
+    category: Optional[str] = None,
+):
+    """Most recent recorded spins, newest first (flushed spins only)"""
+    try:
+        with metrics.time_db("find_recent", collection="spin_history"):
+            spins = await spin_records.recent(limit, list_id=list_id, category=category)
+    except Exception as e:
+        print(f"MongoDB query failed: {e}")
+        raise HTTPException(status_code=503, detail="Spin history is unavailable")
+    return {"spins": spins, "buffer": spin_history.stats()}
+
+@app.get("/api/stats")
+async def get_stats(top: int = Query(10, ge=1, le=MAX_STATS_TOP)):
+    """Most-picked foods, most-spun categories and theme wins"""
+    return popularity.snapshot(top)
+
+@app.get("/api/foods/search")
+async def search_foods(q: str, limit: int = Query(10, ge=1, le=MAX_SEARCH_RESULTS)):
+    """Autocomplete food names across pre-made and custom lists"""
+    return {"query": q, "results": food_index.search(q, limit)}
+
 @app.get("/api/themes")
-async def get_themes():
+async def get_themes(request: Request):
     """Get all available themes"""
-    return {"themes": THEMES}
+    return THEMES_PAYLOAD.response(request)
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,145 @@
+"""No-repeat spin sessions: shuffle bags held in a bounded, idle-evicting store."""
+import random
+import secrets
+import time
+from array import array
+from collections import OrderedDict
+from typing import List, Optional, Sequence, Tuple
+
+
+def _index_array(n: int) -> array:
+    # Smallest unsigned type that holds every index: one byte per item for
+    # any realistic wheel.
+    typecode = "B" if n <= 0x100 else "H" if n <= 0x10000 else "I"
+    return array(typecode, range(n))
+
+
+class ShuffleBag:
+    """Draws each index in ``range(n)`` once, in random order, then refills.
+
+    The bag is a single index array. Positions below ``remaining`` are still
+    in the bag; each draw swaps a random one of them to the boundary (an
+    incremental Fisher-Yates shuffle), so refilling is resetting a counter.
+    The first draw of a refilled bag skips the previous pick, so the same
+    item never comes up twice in a row.
+    """
+
+    __slots__ = ("order", "remaining")
+
+    def __init__(self, n: int):
+        if n < 1:
+            raise ValueError("A shuffle bag needs at least one item")
+        self.order = _index_array(n)
+        self.remaining = n
+
+    def __len__(self) -> int:
+        return len(self.order)
+
+    def draw(self, rng: random.Random = random) -> int:
+        order = self.order
+        low = 0
+        if not self.remaining:
+            self.remaining = len(order)
+            # The last pick of the previous round ended up in order[0].
+            low = 1 if self.remaining > 1 else 0
+        end = self.remaining - 1
+        j = rng.randrange(low, self.remaining)
+        order[j], order[end] = order[end], order[j]
+        self.remaining = end
+        return order[end]
+
+    def draw_many(self, k: int, rng: random.Random = random) -> List[int]:
+        draw = self.draw
+        return [draw(rng) for _ in range(k)]
+
+
+class SpinSession(ShuffleBag):
+    """A shuffle bag over ``items``.
+
+    ``items`` and ``source`` are referenced, never copied, so sessions over
+    the same wheel share them.
+    """
+
+    __slots__ = ("items", "source", "touched")
+
+    def __init__(self, items: Sequence[str], source: Optional[dict], now: float):
+        super().__init__(len(items))
+        self.items = items
+        self.source = source
+        self.touched = now
+
+
+class SessionStore:
+    """Bounded store of spin sessions, dropped after ``idle_ttl`` seconds unused.
+
+    Entries are kept in last-use order, so idle sessions collect at the front
+    and expiring them only ever looks at the oldest few. Each create or get
+    expires at most ``expire_step`` of them, so a burst of sessions going idle
+    together is cleared over several requests rather than stalling one. Past
+    ``maxsize`` the least recently used session is evicted.
+    """
+
+    def __init__(self, maxsize: int = 100_000, idle_ttl: float = 900.0, expire_step: int = 100):
+        self.maxsize = maxsize
+        self.idle_ttl = idle_ttl
+        self.expire_step = expire_step
+        self.created = 0
+        self.expired = 0
+        self.evicted = 0
+        self._sessions: "OrderedDict[str, SpinSession]" = OrderedDict()
+
+    def create(self, items: Sequence[str], source: Optional[dict] = None) -> Tuple[str, SpinSession]:
+        now = time.monotonic()
+        self.expire(now, self.expire_step)
+        session_id = secrets.token_urlsafe(12)
+        session = SpinSession(items, source, now)
+        self._sessions[session_id] = session
+        self.created += 1
+        if len(self._sessions) > self.maxsize:
+            self._sessions.popitem(last=False)
+            self.evicted += 1
+        return session_id, session
+
+    def get(self, session_id: str) -> Optional[SpinSession]:
+        now = time.monotonic()
+        self.expire(now, self.expire_step)
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        if session.touched <= now - self.idle_ttl:
+            del self._sessions[session_id]
+            self.expired += 1
+            return None
+        session.touched = now
+        self._sessions.move_to_end(session_id)
+        return session
+
+    def discard(self, session_id: str) -> bool:
+        return self._sessions.pop(session_id, None) is not None
+
+    def expire(self, now: Optional[float] = None, limit: Optional[int] = None) -> int:
+        """Drop up to ``limit`` sessions idle for ``idle_ttl``; returns how many."""
+        cutoff = (time.monotonic() if now is None else now) - self.idle_ttl
+        sessions = self._sessions
+        dropped = 0
+        while sessions and (limit is None or dropped < limit):
+            oldest = next(iter(sessions.values()))
+            if oldest.touched > cutoff:
+                break
+            sessions.popitem(last=False)
+            dropped += 1
+        self.expired += dropped
+        return dropped
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._sessions),
+            "maxsize": self.maxsize,
+            "idle_ttl_seconds": self.idle_ttl,
+            "created": self.created,
+            "expired": self.expired,
+            "evicted": self.evicted,
+        }
+
+    def __len__(self) -> int:
+        return len(self._sessions)
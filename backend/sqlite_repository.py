@@ -0,0 +1,283 @@
+"""SQLite storage for single-node deployments (e.g. kiosks), in WAL mode."""
+import asyncio
+import json
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Callable, Dict, List, Optional, Tuple
+
+from repository import encode_cursor
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS custom_lists (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    items TEXT NOT NULL,
+    weights TEXT,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS custom_lists_created_at_id ON custom_lists (created_at, id);
+
+CREATE TABLE IF NOT EXISTS spin_history (
+    seq INTEGER PRIMARY KEY,
+    timestamp TEXT NOT NULL,
+    list_id TEXT,
+    category TEXT,
+    record TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS spin_history_timestamp ON spin_history (timestamp);
+
+CREATE TABLE IF NOT EXISTS spin_stats (
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (kind, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS spin_stats_kind_count ON spin_stats (kind, count DESC);
+"""
+
+LIST_COLUMNS = "id, name, items, weights, created_at"
+
+
+class SQLiteDatabase:
+    """One connection to a SQLite file, driven from a dedicated thread.
+
+    Every statement runs on a single worker thread, so disk I/O never blocks
+    the event loop and the connection is never shared between threads. WAL
+    lets other worker processes read while one of them writes; writers wait
+    up to ``busy_timeout_ms`` for the write lock.
+    """
+
+    def __init__(self, path: str, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._conn: Optional[sqlite3.Connection] = None
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sqlite")
+
+    async def connect(self) -> None:
+        await self.run(self._connect)
+
+    def _connect(self, _conn) -> None:
+        # Autocommit; multi-statement writes open their own transaction.
+        conn = sqlite3.connect(self.path, isolation_level=None, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")  # durable at checkpoints; safe with WAL
+        conn.execute(f"PRAGMA busy_timeout={int(self.busy_timeout_ms)}")
+        conn.executescript(SCHEMA)
+        self._conn = conn
+
+    async def run(self, fn: Callable, *args):
+        """Call ``fn(connection, *args)`` on the database thread."""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: fn(self._conn, *args))
+
+    async def close(self) -> None:
+        if self._conn is not None:
+            await self.run(lambda conn: conn.close())
+            self._conn = None
+        self._executor.shutdown(wait=False)
+
+
+def _list_row(custom_list: dict) -> tuple:
+    weights = custom_list.get("weights")
+    return (
+        custom_list["id"],
+        custom_list["name"],
+        json.dumps(custom_list["items"], ensure_ascii=False),
+        None if weights is None else json.dumps(weights),
+        custom_list["created_at"],
+    )
+
+
+def _list_doc(row: tuple) -> dict:
+    list_id, name, items, weights, created_at = row
+    doc = {"id": list_id, "name": name, "items": json.loads(items), "created_at": created_at}
+    if weights is not None:
+        doc["weights"] = json.loads(weights)
+    return doc
+
+
+class SQLiteCustomListRepository:
+    """The custom_lists table; same interface as CustomListRepository."""
+
+    def __init__(self, db: Optional[SQLiteDatabase] = None):
+        self.db = db
+
+    def bind(self, db: SQLiteDatabase) -> None:
+        self.db = db
+
+    async def ensure_indexes(self) -> None:
+        pass  # created with the schema
+
+    async def upsert(self, custom_list: dict) -> Tuple[dict, bool]:
+        def upsert(conn):
+            cursor = conn.execute(
+                f"INSERT INTO custom_lists ({LIST_COLUMNS}) VALUES (?, ?, ?, ?, ?)"
+                " ON CONFLICT (id) DO NOTHING",
+                _list_row(custom_list),
+            )
+            if cursor.rowcount:
+                return dict(custom_list), True
+            row = conn.execute(
+                f"SELECT {LIST_COLUMNS} FROM custom_lists WHERE id = ?", (custom_list["id"],)
+            ).fetchone()
+            return _list_doc(row), False
+        return await self.db.run(upsert)
+
+    async def upsert_many(self, custom_lists: List[dict]) -> Tuple[List[Tuple[int, str]], List[int]]:
+        def upsert_many(conn):
+            failures, created = [], []
+            conn.execute("BEGIN")
+            try:
+                for index, doc in enumerate(custom_lists):
+                    try:
+                        cursor = conn.execute(
+                            f"INSERT INTO custom_lists ({LIST_COLUMNS}) VALUES (?, ?, ?, ?, ?)"
+                            " ON CONFLICT (id) DO NOTHING",
+                            _list_row(doc),
+                        )
+                    except (sqlite3.IntegrityError, TypeError, ValueError) as e:
+                        failures.append((index, str(e)))
+                        continue
+                    if cursor.rowcount:
+                        created.append(index)
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            return failures, created
+        return await self.db.run(upsert_many)
+
+    async def get(self, list_id: str) -> Optional[dict]:
+        def get(conn):
+            return conn.execute(
+                f"SELECT {LIST_COLUMNS} FROM custom_lists WHERE id = ?", (list_id,)
+            ).fetchone()
+        row = await self.db.run(get)
+        return _list_doc(row) if row is not None else None
+
+    async def _after(self, after: Optional[Tuple[str, str]], limit: int) -> List[dict]:
+        def select(conn):
+            if after is None:
+                return conn.execute(
+                    f"SELECT {LIST_COLUMNS} FROM custom_lists ORDER BY created_at, id LIMIT ?", (limit,)
+                ).fetchall()
+            return conn.execute(
+                f"SELECT {LIST_COLUMNS} FROM custom_lists WHERE (created_at, id) > (?, ?)"
+                " ORDER BY created_at, id LIMIT ?",
+                (*after, limit),
+            ).fetchall()
+        return [_list_doc(row) for row in await self.db.run(select)]
+
+    async def page(self, limit: int,
+                   after: Optional[Tuple[str, str]] = None) -> Tuple[List[dict], Optional[str]]:
+        docs = await self._after(after, limit + 1)
+        if len(docs) <= limit:
+            return docs, None
+        docs = docs[:limit]
+        return docs, encode_cursor(docs[-1])
+
+    async def stream(self, after: Optional[Tuple[str, str]] = None,
+                     limit: Optional[int] = None,
+                     batch_size: int = 500) -> AsyncIterator[dict]:
+        """Keyset-paged in ``batch_size`` queries, so no cursor spans awaits."""
+        remaining = limit
+        while remaining is None or remaining > 0:
+            size = batch_size if remaining is None else min(batch_size, remaining)
+            docs = await self._after(after, size)
+            for doc in docs:
+                yield doc
+            if len(docs) < size:
+                return
+            after = (docs[-1]["created_at"], docs[-1]["id"])
+            if remaining is not None:
+                remaining -= len(docs)
+
+
+class SQLiteSpinHistoryRepository:
+    """The spin_history table; same interface as SpinHistoryRepository."""
+
+    def __init__(self, db: Optional[SQLiteDatabase] = None):
+        self.db = db
+
+    def bind(self, db: SQLiteDatabase) -> None:
+        self.db = db
+
+    async def ensure_indexes(self) -> None:
+        pass
+
+    async def insert_many(self, spins: List[dict]) -> None:
+        rows = [
+            (spin["timestamp"], spin.get("list_id"), spin.get("category"),
+             json.dumps(spin, ensure_ascii=False))
+            for spin in spins
+        ]
+
+        def insert_many(conn):
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    "INSERT INTO spin_history (timestamp, list_id, category, record) VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        await self.db.run(insert_many)
+
+    async def recent(self, limit: int, **filters) -> List[dict]:
+        filters = {key: value for key, value in filters.items()
+                   if key in ("list_id", "category") and value is not None}
+        where = " AND ".join(f"{key} = ?" for key in filters)
+
+        def recent(conn):
+            return conn.execute(
+                "SELECT record FROM spin_history"
+                + (f" WHERE {where}" if where else "")
+                + " ORDER BY timestamp DESC, seq DESC LIMIT ?",
+                (*filters.values(), limit),
+            ).fetchall()
+        return [json.loads(record) for record, in await self.db.run(recent)]
+
+
+class SQLiteSpinStatsRepository:
+    """The spin_stats table; same interface as SpinStatsRepository."""
+
+    def __init__(self, db: Optional[SQLiteDatabase] = None):
+        self.db = db
+
+    def bind(self, db: SQLiteDatabase) -> None:
+        self.db = db
+
+    async def ensure_indexes(self) -> None:
+        pass
+
+    async def increment(self, deltas: Dict[str, Dict[str, int]]) -> None:
+        rows = [(kind, key, amount) for kind, counts in deltas.items() for key, amount in counts.items()]
+        if not rows:
+            return
+
+        def increment(conn):
+            conn.execute("BEGIN")
+            try:
+                conn.executemany(
+                    "INSERT INTO spin_stats (kind, key, count) VALUES (?, ?, ?)"
+                    " ON CONFLICT (kind, key) DO UPDATE SET count = count + excluded.count",
+                    rows,
+                )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        await self.db.run(increment)
+
+    async def top(self, kinds, limit: int) -> Dict[str, List[Tuple[str, int]]]:
+        def top(conn):
+            return {
+                kind: conn.execute(
+                    "SELECT key, count FROM spin_stats WHERE kind = ? ORDER BY count DESC LIMIT ?",
+                    (kind, limit),
+                ).fetchall()
+                for kind in kinds
+            }
+        return await self.db.run(top)
@@ -0,0 +1,114 @@
+"""Storage backends, chosen by configuration.
+
+A backend bundles the three repositories the server uses with how to open,
+check and close the store behind them:
+
+- ``mongo``: MongoDB via motor (the default, shared by every node)
+- ``sqlite``: a local SQLite file in WAL mode, for single-node deployments
+- ``memory``: process-local, for tests and benchmarks; nothing persists
+"""
+from motor.motor_asyncio import AsyncIOMotorClient
+
+from repository import (
+    CustomListRepository,
+    InMemoryCustomListRepository,
+    InMemorySpinHistoryRepository,
+    InMemorySpinStatsRepository,
+    SpinHistoryRepository,
+    SpinStatsRepository,
+)
+from sqlite_repository import (
+    SQLiteCustomListRepository,
+    SQLiteDatabase,
+    SQLiteSpinHistoryRepository,
+    SQLiteSpinStatsRepository,
+)
+
+STORAGE_BACKENDS = ("mongo", "sqlite", "memory")
+
+
+class MongoStorage:
+    name = "mongo"
+
+    def __init__(self, url: str, database: str = "food_roulette",
+                 max_pool_size: int = 100, timeout_ms: int = 5000):
+        self.url = url
+        self.database = database
+        self.max_pool_size = max_pool_size
+        self.timeout_ms = timeout_ms
+        self.client = None
+        self.db = None
+        self.custom_lists = CustomListRepository()
+        self.spin_history = SpinHistoryRepository()
+        self.spin_stats = SpinStatsRepository()
+
+    async def open(self) -> None:
+        # Opened per process (lifespan, not import) so every worker gets its
+        # own connection pool after the fork.
+        self.client = AsyncIOMotorClient(
+            self.url, maxPoolSize=self.max_pool_size, serverSelectionTimeoutMS=self.timeout_ms
+        )
+        self.db = self.client[self.database]
+        for repository in (self.custom_lists, self.spin_history, self.spin_stats):
+            repository.bind(self.db)
+
+    async def ping(self) -> None:
+        await self.client.admin.command("ping")
+
+    async def close(self) -> None:
+        self.client.close()
+
+
+class SQLiteStorage:
+    name = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self.db = None
+        self.custom_lists = SQLiteCustomListRepository()
+        self.spin_history = SQLiteSpinHistoryRepository()
+        self.spin_stats = SQLiteSpinStatsRepository()
+
+    async def open(self) -> None:
+        self.db = SQLiteDatabase(self.path)
+        await self.db.connect()
+        for repository in (self.custom_lists, self.spin_history, self.spin_stats):
+            repository.bind(self.db)
+
+    async def ping(self) -> None:
+        await self.db.run(lambda conn: conn.execute("SELECT 1").fetchone())
+
+    async def close(self) -> None:
+        await self.db.close()
+
+
+class MemoryStorage:
+    name = "memory"
+
+    def __init__(self):
+        self.custom_lists = InMemoryCustomListRepository()
+        self.spin_history = InMemorySpinHistoryRepository()
+        self.spin_stats = InMemorySpinStatsRepository()
+
+    async def open(self) -> None:
+        pass
+
+    async def ping(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+
+def create_storage(backend: str, mongo_url: str = None, mongo_max_pool_size: int = 100,
+                   mongo_timeout_ms: int = 5000, sqlite_path: str = "food_roulette.db",
+                   mongo_database: str = "food_roulette"):
+    """The configured backend; raises ValueError for an unknown name."""
+    if backend == "mongo":
+        return MongoStorage(mongo_url, database=mongo_database,
+                            max_pool_size=mongo_max_pool_size, timeout_ms=mongo_timeout_ms)
+    if backend == "sqlite":
+        return SQLiteStorage(sqlite_path)
+    if backend == "memory":
+        return MemoryStorage()
+    raise ValueError(f"Unknown storage backend {backend!r}; expected one of {', '.join(STORAGE_BACKENDS)}")
@@ -0,0 +1,21 @@
+import os
+import sys
+
+import pytest
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
+
+
+@pytest.fixture(scope="session")
+def client():
+    """The app on the in-memory backend, started once: its background tasks
+    and their events belong to a single event loop."""
+    os.environ["STORAGE_BACKEND"] = "memory"
+    from fastapi.testclient import TestClient
+
+    import server
+
+    with TestClient(server.app) as c:
+        yield c
@@ -0,0 +1,130 @@
+import asyncio
+import json
+
+import pytest
+
+from bulk_import import RowError, build_custom_list, iter_rows
+from repository import content_id
+
+ROWS = [
+    {"name": "Lunch", "items": ["Pizza", "Sushi"]},
+    1.5,
+    "a string with , and ] and \\\" in it",
+    [1, [2, {"x": "}"}]],
+    -12e3,
+    None,
+    {"name": "Dinner", "items": ["Tacos"], "weights": [1, 2.25]},
+]
+
+
+def collect(chunks, ndjson=False, max_row_size=None):
+    async def source():
+        for chunk in chunks:
+            yield chunk
+
+    async def run():
+        return [row async for row in iter_rows(source(), ndjson, max_row_size)]
+
+    return asyncio.run(run())
+
+
+def values(rows):
+    return [value for _, value in rows]
+
+
+def errors(rows):
+    return [(row, str(value)) for row, value in rows if isinstance(value, RowError)]
+
+
+def test_array_split_at_every_boundary():
+    body = json.dumps(ROWS, indent=1).encode()
+    for cut in range(len(body) + 1):
+        rows = collect([body[:cut], body[cut:]])
+        assert values(rows) == ROWS, cut
+
+
+def test_array_one_byte_chunks():
+    body = json.dumps(ROWS).encode()
+    rows = collect([body[i:i + 1] for i in range(len(body))])
+    assert values(rows) == ROWS
+    assert [row for row, _ in rows] == list(range(len(ROWS)))
+
+
+def test_number_split_across_chunks():
+    assert values(collect([b"[1.", b"5, 2", b"0]"])) == [1.5, 20]
+    assert values(collect([b"[1", b"2"])) [0] == 12
+
+
+def test_multibyte_character_split_across_chunks():
+    body = json.dumps(["Crème brûlée"], ensure_ascii=False).encode()
+    assert values(collect([body[i:i + 1] for i in range(len(body))])) == ["Crème brûlée"]
+
+
+def test_ndjson_split_at_every_boundary():
+    body = "\n".join(json.dumps(row) for row in ROWS).encode() + b"\n"
+    for cut in range(len(body) + 1):
+        assert values(collect([body[:cut], body[cut:]], ndjson=True)) == ROWS, cut
+
+
+@pytest.mark.parametrize("body, message", [
+    (b'{"a": 1}', "Body must be a JSON array"),
+    (b"[1 2]", "Expected ',' or ']'"),
+    (b"[1, 2", "not closed"),
+    (b"[1] 2", "Unexpected data"),
+    (b"[tru]", "Invalid JSON"),
+])
+def test_array_structure_errors(body, message):
+    assert message in errors(collect([body]))[-1][1]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_oversized_array_row_is_skipped(chunk_size):
+    body = json.dumps([{"name": "a"}, {"name": "x" * 500}, "y" * 300, {"name": "b"}]).encode()
+    rows = collect([body[i:i + chunk_size] for i in range(0, len(body), chunk_size)], max_row_size=100)
+    assert [row for row, _ in errors(rows)] == [1, 2]
+    assert all("larger than 100" in message for _, message in errors(rows))
+    assert rows[0] == (0, {"name": "a"})
+    assert rows[-1] == (3, {"name": "b"})
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 1 << 16])
+def test_oversized_ndjson_row_is_skipped(chunk_size):
+    body = b'{"name": "a"}\n"' + b"x" * 500 + b'"\n{"name": "b"}\n'
+    rows = collect([body[i:i + chunk_size] for i in range(0, len(body), chunk_size)], ndjson=True, max_row_size=100)
+    assert [row for row, _ in errors(rows)] == [1]
+    assert values(rows)[0] == {"name": "a"}
+    assert rows[-1] == (2, {"name": "b"})
+
+
+def test_imported_list_id_is_its_content_hash():
+    doc = build_custom_list({"name": "Lunch", "items": ["Pizza"], "weights": [2]})
+    assert doc["id"] == content_id("Lunch", ["Pizza"], [2.0])
+    assert build_custom_list({"id": doc["id"], "name": "Lunch", "items": ["Pizza"], "weights": [2]})["id"] == doc["id"]
+
+
+def test_row_cannot_claim_another_lists_id():
+    with pytest.raises(RowError, match="does not match"):
+        build_custom_list({"id": content_id("Lunch", ["Pizza"]), "name": "evil", "items": ["Poison"]})
+    with pytest.raises(RowError, match="does not match"):
+        build_custom_list({"id": "legacy-uuid", "name": "Lunch", "items": ["Pizza"]})
+
+
+@pytest.mark.parametrize("created_at, expected", [
+    ("2024-05-01 12:30:00", "2024-05-01 12:30:00"),
+    ("2024-05-01T12:30:00.250000", "2024-05-01 12:30:00.250000"),
+])
+def test_created_at_is_normalised(created_at, expected):
+    assert build_custom_list({"name": "a", "items": ["b"], "created_at": created_at})["created_at"] == expected
+
+
+@pytest.mark.parametrize("created_at", ["zzz", "", 1714566600, "2024-13-01",
+                                        "0001-01-01T00:00:00+14:00", "9999-12-31T23:59:59-14:00"])
+def test_created_at_must_be_a_timestamp(created_at):
+    with pytest.raises(RowError, match="created_at"):
+        build_custom_list({"name": "a", "items": ["b"], "created_at": created_at})
+
+
+@pytest.mark.parametrize("weights", [[10 ** 400, 1], [float("inf"), 1], [-1, 1], [0, 0], [1]])
+def test_bad_weights_are_row_errors(weights):
+    with pytest.raises(RowError):
+        build_custom_list({"name": "a", "items": ["b", "c"], "weights": weights})
@@ -0,0 +1,98 @@
+import gzip
+
+import pytest
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from fastapi.testclient import TestClient
+
+from compression import CompressionMiddleware, negotiate
+
+BIG = b'{"items": [' + b",".join(b'"Pizza"' for _ in range(200)) + b"]}"
+CHUNKS = [b'{"n": %d}\n' % n * 20 for n in range(5)]
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=100, encodings=["gzip"])
+
+
+@app.get("/small")
+async def small():
+    return {"ok": True}
+
+
+@app.get("/big")
+async def big():
+    return Response(BIG, media_type="application/json")
+
+
+@app.get("/stream")
+async def stream():
+    async def chunks():
+        for chunk in CHUNKS:
+            yield chunk
+    return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+
+@app.get("/encoded")
+async def encoded():
+    return Response(gzip.compress(BIG), media_type="application/json", headers={"Content-Encoding": "gzip"})
+
+
+@app.get("/image")
+async def image():
+    return Response(b"\x89PNG" + b"\0" * 1000, media_type="image/png")
+
+
+@pytest.fixture(scope="module")
+def client():
+    with TestClient(app) as c:
+        yield c
+
+
+def get(client, path, accept="gzip"):
+    return client.get(path, headers={"accept-encoding": accept})
+
+
+def test_bodies_under_the_threshold_are_sent_as_is(client):
+    response = get(client, "/small")
+    assert "content-encoding" not in response.headers
+    assert response.json() == {"ok": True}
+    assert "Accept-Encoding" in response.headers["vary"]
+
+
+def test_large_bodies_are_compressed(client):
+    response = get(client, "/big")
+    assert response.headers["content-encoding"] == "gzip"
+    assert int(response.headers["content-length"]) < len(BIG)
+    assert response.content == BIG
+
+
+def test_streamed_bodies_are_compressed_chunk_by_chunk(client):
+    response = get(client, "/stream")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.content == b"".join(CHUNKS)
+
+
+def test_already_encoded_responses_pass_through(client):
+    response = get(client, "/encoded")
+    assert response.headers["content-encoding"] == "gzip"
+    assert response.content == BIG  # decoded once, so not compressed twice
+
+
+def test_uncompressible_types_and_clients_without_gzip(client):
+    assert "content-encoding" not in get(client, "/image").headers
+    response = get(client, "/big", accept="identity")
+    assert "content-encoding" not in response.headers
+    assert response.content == BIG
+
+
+@pytest.mark.parametrize("header, expected", [
+    (None, None),
+    ("gzip", "gzip"),
+    ("gzip;q=0", None),
+    ("*", "gzip"),
+    ("br;q=1, gzip;q=0.5", "gzip"),
+    ("identity", None),
+])
+def test_negotiate(header, expected):
+    assert negotiate(header, ["gzip"]) == expected
@@ -0,0 +1,56 @@
+import asyncio
+
+import pytest
+
+from events import Broadcaster, SubscriberLagged, SubscriptionClosed
+
+
+def test_events_reach_every_subscriber():
+    async def run():
+        broadcaster = Broadcaster()
+        first, second = broadcaster.subscribe(), broadcaster.subscribe()
+        broadcaster.publish("a")
+        return await first.get(), await second.get()
+
+    assert asyncio.run(run()) == ("a", "a")
+
+
+def test_overflowing_a_queue_drops_the_subscriber():
+    async def run():
+        broadcaster = Broadcaster(max_queue=2)
+        slow = broadcaster.subscribe()
+        for event in range(3):
+            broadcaster.publish(event)
+        received = []
+        with pytest.raises(SubscriberLagged):
+            while True:
+                received.append(await slow.get())
+        return broadcaster, received
+
+    broadcaster, received = asyncio.run(run())
+    assert received == [1]
+    assert broadcaster.stats() == {"subscribers": 0, "published": 3, "dropped": 1}
+
+
+def test_subscriber_cap():
+    async def run():
+        broadcaster = Broadcaster(max_subscribers=1)
+        with broadcaster.subscribe():
+            with pytest.raises(OverflowError):
+                broadcaster.subscribe()
+        broadcaster.subscribe()
+
+    asyncio.run(run())
+
+
+def test_close_ends_subscriptions_and_get_times_out():
+    async def run():
+        broadcaster = Broadcaster()
+        subscription = broadcaster.subscribe()
+        assert await subscription.get(timeout=0.01) is None
+        broadcaster.close()
+        with pytest.raises(SubscriptionClosed):
+            await subscription.get()
+        assert not isinstance(SubscriptionClosed(), SubscriberLagged)
+
+    asyncio.run(run())
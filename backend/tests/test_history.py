@@ -0,0 +1,94 @@
+import asyncio
+
+from history import WriteBehindBuffer
+
+
+class Recorder:
+    def __init__(self):
+        self.batches = []
+        self.gate = None  # an Event that holds writes until it is set
+
+    async def write(self, batch):
+        if self.gate is not None:
+            await self.gate.wait()
+        self.batches.append([record["n"] for record in batch])
+
+
+def test_full_batches_flush_without_waiting_for_the_timer():
+    recorder = Recorder()
+
+    async def run():
+        buffer = WriteBehindBuffer(recorder.write, max_batch=3, flush_interval=3600)
+        for n in range(7):
+            await buffer.put({"n": n})
+        await asyncio.sleep(0.01)
+        flushed = list(recorder.batches)
+        await buffer.close()
+        return flushed, buffer
+
+    flushed, buffer = asyncio.run(run())
+    assert flushed == [[0, 1, 2], [3, 4, 5]]
+    assert recorder.batches[-1] == [6]
+    assert buffer.stats() == {"pending": 0, "written": 7, "dropped": 0}
+
+
+def test_timer_flushes_a_partial_batch():
+    recorder = Recorder()
+
+    async def run():
+        buffer = WriteBehindBuffer(recorder.write, max_batch=100, flush_interval=0.01)
+        await buffer.put({"n": 1})
+        await asyncio.sleep(0.1)
+        await buffer.close()
+
+    asyncio.run(run())
+    assert recorder.batches == [[1]]
+
+
+def test_put_blocks_while_the_buffer_is_full():
+    recorder = Recorder()
+
+    async def run():
+        recorder.gate = asyncio.Event()
+        buffer = WriteBehindBuffer(recorder.write, max_batch=2, flush_interval=3600, max_pending=2)
+        for n in range(4):
+            await buffer.put({"n": n})
+            await asyncio.sleep(0)
+        blocked = asyncio.create_task(buffer.put({"n": 4}))
+        await asyncio.sleep(0.05)
+        assert not blocked.done()
+        recorder.gate.set()
+        await asyncio.wait_for(blocked, 1)
+        await buffer.close()
+
+    asyncio.run(run())
+    assert [n for batch in recorder.batches for n in batch] == [0, 1, 2, 3, 4]
+
+
+def test_close_drains_everything_pending():
+    recorder = Recorder()
+
+    async def run():
+        buffer = WriteBehindBuffer(recorder.write, max_batch=2, flush_interval=3600)
+        for n in range(5):
+            await buffer.put({"n": n})
+        await buffer.close()
+        return buffer
+
+    buffer = asyncio.run(run())
+    assert [n for batch in recorder.batches for n in batch] == [0, 1, 2, 3, 4]
+    assert buffer.stats()["pending"] == 0
+
+
+def test_failed_batches_are_dropped_and_counted():
+    async def failing(batch):
+        raise ConnectionError("down")
+
+    async def run():
+        buffer = WriteBehindBuffer(failing, max_batch=2, flush_interval=3600)
+        for n in range(3):
+            await buffer.put({"n": n})
+        await buffer.close()
+        return buffer
+
+    assert asyncio.run(run()).stats() == {"pending": 0, "written": 0, "dropped": 3}
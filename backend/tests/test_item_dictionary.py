@@ -0,0 +1,45 @@
+import asyncio
+
+from repository import ItemDictionary, item_ref
+
+
+class FakeFoodItems:
+    """The two food_items calls ItemDictionary makes, over a dict."""
+
+    def __init__(self):
+        self.docs = {}
+        self.finds = 0
+
+    async def bulk_write(self, updates, ordered=True):
+        for update in updates:
+            self.docs.setdefault(update._filter["_id"], update._doc["$setOnInsert"]["name"])
+
+    async def _find(self, ids):
+        for ref in ids:
+            if ref in self.docs:
+                yield {"_id": ref, "name": self.docs[ref]}
+
+    def find(self, query):
+        self.finds += 1
+        return self._find(query["_id"]["$in"])
+
+
+class FakeDb:
+    def __init__(self):
+        self.food_items = FakeFoodItems()
+
+
+def test_names_are_bounded_and_reloaded_when_evicted():
+    db = FakeDb()
+    items = ItemDictionary(db, max_names=2)
+
+    async def run():
+        refs = await items.intern(["Pizza", "Sushi", "Tacos"])
+        assert len(items._names) == 2
+        assert await items.resolve(refs) == dict(zip(refs, ["Pizza", "Sushi", "Tacos"]))
+        assert db.food_items.finds == 1
+        assert await items.resolve([item_ref("Pizza")]) == {item_ref("Pizza"): "Pizza"}
+        assert db.food_items.finds == 1
+
+    asyncio.run(run())
+    assert len(items._names) == 2
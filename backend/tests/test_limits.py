@@ -0,0 +1,54 @@
+import asyncio
+
+import pytest
+
+from limits import InvalidPayload, ItemLimits, PayloadTooLarge
+
+LIMITS = ItemLimits(max_body_bytes=64, max_items=3, max_item_length=5)
+
+
+def read(chunks, content_length=None):
+    async def source():
+        for chunk in chunks:
+            yield chunk
+
+    return asyncio.run(LIMITS.read(source(), content_length))
+
+
+def test_parse_accepts_a_list_of_strings():
+    assert LIMITS.parse(b'["Pizza", "Sushi"]') == ["Pizza", "Sushi"]
+
+
+@pytest.mark.parametrize("body, error", [
+    (b'["a", "b", "c", "d"]', PayloadTooLarge),
+    (b'["Spaghetti"]', PayloadTooLarge),
+    (b'["a", 1]', InvalidPayload),
+    (b'{"items": []}', InvalidPayload),
+    (b"[", InvalidPayload),
+])
+def test_parse_rejects(body, error):
+    with pytest.raises(error):
+        LIMITS.parse(body)
+
+
+def test_check_matches_parse():
+    LIMITS.check(["a", "b", "c"])
+    with pytest.raises(PayloadTooLarge):
+        LIMITS.check(["a"] * 4)
+    with pytest.raises(PayloadTooLarge):
+        LIMITS.check(["toolong"])
+
+
+def test_read_refuses_large_declared_length_without_reading():
+    def chunks():
+        raise AssertionError("body was read")
+        yield b""
+
+    with pytest.raises(PayloadTooLarge):
+        asyncio.run(LIMITS.read(chunks(), "65"))
+
+
+def test_read_stops_once_the_stream_passes_the_cap():
+    assert read([b"x" * 32, b"x" * 32]) == b"x" * 64
+    with pytest.raises(PayloadTooLarge):
+        read([b"x" * 40, b"x" * 40, b"never reached"])
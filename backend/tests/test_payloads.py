@@ -0,0 +1,28 @@
+import pytest
+
+
+@pytest.mark.parametrize("path", ["/api/premade-lists", "/api/themes"])
+def test_matching_etag_gets_304(client, path):
+    first = client.get(path, headers={"accept-encoding": "identity"})
+    etag = first.headers["etag"]
+    for tag in (etag, f"W/{etag}", f'"other", {etag}', "*"):
+        response = client.get(path, headers={"accept-encoding": "identity", "if-none-match": tag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+
+def test_stale_etag_gets_the_body(client):
+    response = client.get("/api/premade-lists", headers={"if-none-match": '"stale"'})
+    assert response.status_code == 200
+    assert "lists" in response.json()
+
+
+def test_compressed_variant_has_its_own_etag(client):
+    plain = client.get("/api/premade-lists", headers={"accept-encoding": "identity"})
+    gzipped = client.get("/api/premade-lists", headers={"accept-encoding": "gzip"})
+    assert gzipped.headers["content-encoding"] == "gzip"
+    assert gzipped.headers["etag"] != plain.headers["etag"]
+    revalidated = client.get("/api/premade-lists",
+                             headers={"accept-encoding": "gzip", "if-none-match": gzipped.headers["etag"]})
+    assert revalidated.status_code == 304
@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+
+from popularity import BoundedCounter, PopularityStats
+from repository import InMemorySpinStatsRepository
+
+
+class FlakyStats(InMemorySpinStatsRepository):
+    """Fails (or is cancelled in) the next increment or top call."""
+
+    def __init__(self):
+        super().__init__()
+        self.fail = {}
+
+    async def increment(self, deltas):
+        if self.fail.pop("increment", None):
+            raise ConnectionError("increment failed")
+        await super().increment(deltas)
+
+    async def top(self, kinds, limit):
+        error = self.fail.pop("top", None)
+        if error is not None:
+            raise error
+        return await super().top(kinds, limit)
+
+
+def spin(stats, n, food="Pizza"):
+    for _ in range(n):
+        stats.record(food, "classic", "Italian")
+
+
+def stored_total(repository):
+    return sum(count for _, count in asyncio.run(repository.top(("total",), 10))["total"])
+
+
+def test_fold_stores_deltas_and_reseeds():
+    repository = InMemorySpinStatsRepository()
+    stats = PopularityStats(repository, capacity=10)
+    spin(stats, 3)
+    spin(stats, 2, "Sushi")
+    asyncio.run(stats.fold())
+    assert stored_total(repository) == 5
+    assert stats.snapshot(2)["foods"] == [{"name": "Pizza", "count": 3}, {"name": "Sushi", "count": 2}]
+    assert stats.total == 5
+
+
+def test_failed_increment_keeps_deltas_for_next_fold():
+    repository = FlakyStats()
+    stats = PopularityStats(repository)
+    spin(stats, 10)
+    repository.fail["increment"] = True
+    with pytest.raises(ConnectionError):
+        asyncio.run(stats.fold())
+    assert stored_total(repository) == 0
+    asyncio.run(stats.fold())
+    assert stored_total(repository) == 10
+
+
+@pytest.mark.parametrize("error", [ConnectionError("top failed"), asyncio.CancelledError()])
+def test_failed_reseed_does_not_count_twice(error):
+    repository = FlakyStats()
+    stats = PopularityStats(repository)
+    spin(stats, 10)
+    repository.fail["top"] = error
+    with pytest.raises(type(error)):
+        asyncio.run(stats.fold())
+    assert stats.total == 10
+    asyncio.run(stats.fold())
+    assert stored_total(repository) == 10
+    assert stats.total == 10
+
+
+def test_close_folds_once_without_cancelling():
+    repository = InMemorySpinStatsRepository()
+
+    async def run():
+        stats = PopularityStats(repository, fold_interval=3600)
+        stats.start()
+        await asyncio.sleep(0)
+        spin(stats, 4)
+        await stats.close()
+        return stats
+
+    stats = asyncio.run(run())
+    assert stored_total(repository) == 4
+    assert stats.total == 4
+
+
+def test_bounded_counter_prunes_to_heaviest():
+    counter = BoundedCounter(2)
+    for key, amount in (("a", 5), ("b", 4), ("c", 1), ("d", 1), ("e", 3)):
+        counter.add(key, amount)
+    assert len(counter.counts) <= 4
+    assert counter.top(2) == [("a", 5), ("b", 4)]
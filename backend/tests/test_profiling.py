@@ -0,0 +1,49 @@
+import pytest
+
+from profiling import PROFILE_HEADER, RequestProfiler, sign_profile_header
+
+SECRET = "s3cret"
+NOW = 1_700_000_000.0
+
+
+@pytest.fixture
+def profiler(tmp_path):
+    return RequestProfiler(str(tmp_path), secret=SECRET, max_ttl=3600)
+
+
+def test_fresh_signed_header_is_accepted(profiler):
+    assert profiler.verify(sign_profile_header(SECRET, ttl=300, now=NOW), now=NOW)
+    assert profiler.verify(sign_profile_header(SECRET, ttl=300, now=NOW), now=NOW + 299)
+
+
+def test_expired_header_is_rejected(profiler):
+    assert not profiler.verify(sign_profile_header(SECRET, ttl=300, now=NOW), now=NOW + 301)
+
+
+def test_header_beyond_max_ttl_is_rejected(profiler):
+    assert profiler.verify(sign_profile_header(SECRET, ttl=3600, now=NOW), now=NOW)
+    assert not profiler.verify(sign_profile_header(SECRET, ttl=3601, now=NOW), now=NOW)
+
+
+@pytest.mark.parametrize("tamper", [
+    lambda value: value[:-1] + ("0" if value[-1] != "0" else "1"),       # bad HMAC
+    lambda value: f"{int(value.split(':')[0]) + 1}:{value.split(':')[1]}",  # moved expiry
+    lambda value: sign_profile_header("other secret", ttl=300, now=NOW),
+    lambda value: "garbage",
+    lambda value: "",
+])
+def test_bad_signatures_are_rejected(profiler, tamper):
+    assert not profiler.verify(tamper(sign_profile_header(SECRET, ttl=300, now=NOW)), now=NOW)
+
+
+def test_without_a_secret_nothing_verifies(tmp_path):
+    profiler = RequestProfiler(str(tmp_path))
+    assert not profiler.enabled
+    assert not profiler.verify(sign_profile_header(SECRET, now=NOW), now=NOW)
+
+
+def test_wants_reads_the_header(profiler):
+    header = sign_profile_header(SECRET, ttl=300).encode()
+    assert profiler.wants({"headers": [(PROFILE_HEADER, header)]})
+    assert not profiler.wants({"headers": [(PROFILE_HEADER, b"1:bad")]})
+    assert not profiler.wants({"headers": []})
@@ -0,0 +1,53 @@
+import asyncio
+
+import pytest
+
+from repository import InMemoryCustomListRepository, content_id, decode_cursor, encode_cursor
+
+
+def test_cursor_round_trip():
+    doc = {"created_at": "2024-05-01 12:00:00", "id": "abc"}
+    assert decode_cursor(encode_cursor(doc)) == ("2024-05-01 12:00:00", "abc")
+
+
+@pytest.mark.parametrize("cursor", ["!!!", "bm90IGpzb24", "WzFd", "WzEsIDJd"])
+def test_garbage_cursor_is_a_value_error(cursor):
+    with pytest.raises(ValueError):
+        decode_cursor(cursor)
+
+
+def test_keyset_pages_cover_every_list_once_with_ties():
+    repository = InMemoryCustomListRepository()
+    # Several lists share a created_at; id breaks the tie.
+    docs = [{"id": f"id{n:02}", "name": str(n), "items": ["x"], "created_at": f"2024-05-0{n // 4 + 1}"}
+            for n in range(10)]
+
+    async def run():
+        for doc in reversed(docs):
+            await repository.upsert(doc)
+        seen, after = [], None
+        while True:
+            page, cursor = await repository.page(3, after)
+            seen += [doc["id"] for doc in page]
+            if cursor is None:
+                return seen
+            after = decode_cursor(cursor)
+
+    assert asyncio.run(run()) == [doc["id"] for doc in docs]
+
+
+def test_content_id_ignores_whitespace_and_weight_types():
+    assert content_id(" Lunch ", ["Pizza "], [1, 2]) == content_id("Lunch", ["Pizza"], [1.0, 2.0])
+    assert content_id("Lunch", ["Pizza"]) != content_id("Lunch", ["Pizza"], [1])
+
+
+def test_upsert_is_idempotent():
+    repository = InMemoryCustomListRepository()
+    doc = {"id": "a", "name": "Lunch", "items": ["Pizza"], "created_at": "2024-05-01"}
+
+    async def run():
+        assert (await repository.upsert(doc))[1]
+        stored, created = await repository.upsert({**doc, "created_at": "2025-01-01"})
+        assert not created and stored["created_at"] == "2024-05-01"
+
+    asyncio.run(run())
@@ -0,0 +1,76 @@
+import asyncio
+
+import pytest
+from pymongo.errors import ConnectionFailure, DuplicateKeyError
+
+from resilience import CircuitBreaker, CircuitOpenError, GuardedRepository
+
+
+def fail(breaker, error):
+    with pytest.raises(type(error)):
+        with breaker.guard():
+            raise error
+
+
+def test_opens_after_consecutive_unavailability_errors():
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+    fail(breaker, ConnectionFailure())
+    assert breaker.state == "closed"
+    fail(breaker, ConnectionFailure())
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        with breaker.guard():
+            pass
+    assert breaker.rejected == 1
+
+
+def test_bad_requests_do_not_trip_the_breaker():
+    breaker = CircuitBreaker(failure_threshold=1)
+    fail(breaker, DuplicateKeyError("dup"))
+    assert breaker.state == "closed"
+
+
+def test_half_open_lets_one_trial_through():
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    fail(breaker, ConnectionFailure())
+    breaker.opened_at -= 60
+    assert breaker.state == "half_open"
+    breaker.before_call()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == "closed"
+
+
+def test_failed_trial_reopens():
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+    for _ in range(3):
+        fail(breaker, ConnectionFailure())
+    breaker.opened_at -= 60
+    fail(breaker, ConnectionFailure())
+    assert breaker.state == "open"
+
+
+def test_guarded_repository_wraps_coroutines_and_streams():
+    class Target:
+        async def get(self):
+            raise ConnectionFailure()
+
+        async def stream(self):
+            yield 1
+            yield 2
+
+        name = "target"
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+    repository = GuardedRepository(Target(), breaker)
+
+    async def run():
+        assert [item async for item in repository.stream()] == [1, 2]
+        with pytest.raises(ConnectionFailure):
+            await repository.get()
+        with pytest.raises(CircuitOpenError):
+            await repository.get()
+
+    asyncio.run(run())
+    assert repository.name == "target"
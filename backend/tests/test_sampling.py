@@ -0,0 +1,42 @@
+import random
+from collections import Counter
+
+import pytest
+
+from sampling import AliasTable, AliasTableCache, validate_weights
+
+
+def test_draws_follow_weights():
+    table = AliasTable([1, 3, 0, 4])
+    counts = Counter(table.draw_many(80_000, random.Random(1)))
+    assert counts[2] == 0
+    assert counts[1] / counts[0] == pytest.approx(3, rel=0.1)
+    assert counts[3] / counts[0] == pytest.approx(4, rel=0.1)
+
+
+def test_huge_weights_do_not_overflow():
+    table = AliasTable([1e308, 1e308])
+    counts = Counter(table.draw_many(10_000, random.Random(2)))
+    assert set(counts) == {0, 1}
+    assert counts[0] / counts[1] == pytest.approx(1, rel=0.1)
+
+
+def test_subnormal_weights_keep_zero_weight_items_out():
+    table = AliasTable([1e-320, 0])
+    assert set(table.draw_many(10_000, random.Random(3))) == {0}
+
+
+@pytest.mark.parametrize("weights", [[1, 2], [1, float("nan"), 1], [1, -1, 1], [0, 0, 0]])
+def test_validate_weights_rejects(weights):
+    with pytest.raises(ValueError):
+        validate_weights(weights, 3)
+
+
+def test_cache_reuses_and_bounds_tables():
+    cache = AliasTableCache(maxsize=2)
+    first = cache.get([1, 2])
+    assert cache.get([1, 2]) is first
+    cache.get([3, 4])
+    cache.get([5, 6])
+    assert len(cache) == 2
+    assert cache.get([1, 2]) is not first
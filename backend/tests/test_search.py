@@ -0,0 +1,42 @@
+import pytest
+
+from search import FoodSearchIndex, normalize
+
+
+def names(results):
+    return [result["name"] for result in results]
+
+
+def test_normalize_drops_accents_emoji_and_case():
+    assert normalize("  Crème Brûlée 🍮 ") == "creme brulee"
+
+
+def test_search_matches_any_word_and_ranks_name_starts_first():
+    index = FoodSearchIndex()
+    index.add_many(["Spaghetti Carbonara", "Carbonara Pizza", "Pizza", "Pizza"])
+    assert names(index.search("carb")) == ["Carbonara Pizza", "Spaghetti Carbonara"]
+    assert index.search("pizza")[0] == {"name": "Pizza", "lists": 2}
+
+
+def test_long_names_index_a_bounded_prefix():
+    index = FoodSearchIndex(max_key_length=20)
+    name = " ".join(f"word{n}" for n in range(100))
+    index.add(name)
+    assert len(index._entries) <= 20 // 2
+    assert all(len(key) <= 20 for key, _, _ in index._entries)
+    assert names(index.search("word2")) == [name]
+    assert index.search("word99") == []
+
+
+@pytest.mark.parametrize("bulk", [False, True])
+def test_index_stops_growing_at_max_items(bulk):
+    index = FoodSearchIndex(max_items=3)
+    foods = ["Pizza", "Sushi", "Tacos", "Ramen", "Pho"]
+    if bulk:
+        index.add_many(foods + ["Pizza"])
+    else:
+        for food in foods + ["Pizza"]:
+            index.add(food)
+    assert len(index) == 3
+    assert index.search("ramen") == []
+    assert index.search("pizza") == [{"name": "Pizza", "lists": 2}]
@@ -0,0 +1,213 @@
+import asyncio
+import json
+
+import pytest
+
+
+@pytest.mark.parametrize("message", ["²", "9" * 5000, "0", "12345678901"],
+                         ids=["superscript", "5000 digits", "zero", "too many"])
+def test_spin_channel_rejects_bad_counts_and_stays_open(client, message):
+    with client.websocket_connect("/api/ws/spin") as ws:
+        ws.send_text('{"op": "register", "items": ["Pizza", "Sushi"]}')
+        assert ws.receive_json() == {"op": "registered", "total_options": 2}
+        ws.send_text(message)
+        assert "error" in ws.receive_json()
+        ws.send_text("3")
+        spins = ws.receive_json()
+        assert len(spins) == 3 and all(index in (0, 1) for index, _ in spins)
+
+
+@pytest.mark.parametrize("message", [
+    '{"op": "register", "category": ["x"]}',
+    '{"op": "register", "list_id": {"a": 1}}',
+    '{"op": "register", "items": ["a", "b"], "weights": [1' + "0" * 400 + ', 1]}',
+], ids=["list category", "object list_id", "huge integer weight"])
+def test_spin_channel_rejects_bad_registrations_and_stays_open(client, message):
+    with client.websocket_connect("/api/ws/spin") as ws:
+        ws.send_text(message)
+        assert "error" in ws.receive_json()
+        ws.send_text('{"op": "register", "category": "italian"}')
+        assert ws.receive_json()["op"] == "registered"
+
+
+def test_wheel_layout_is_capped_but_large_wheels_still_spin(client):
+    import server
+
+    items = [f"item {n}" for n in range(server.WHEEL_MAX_SEGMENTS + 1)]
+    misses = server.wheel_layouts.misses
+    response = client.post("/api/wheel/spin", json={"food_items": items, "layout": "segments"})
+    assert response.status_code == 413
+    response = client.post("/api/wheel/spin", json={"food_items": items, "layout": "none"})
+    assert response.status_code == 200
+    body = response.json()
+    assert "segments" not in body and 0 <= body["stop_angle"] < 360
+    assert server.wheel_layouts.misses == misses
+
+
+def test_wheel_spin_includes_cached_layout(client):
+    body = {"category": "italian", "theme_id": "sunset", "layout": "segments"}
+    first = client.post("/api/wheel/spin", json=body).json()
+    second = client.post("/api/wheel/spin", json=body).json()
+    assert first["segments"] == second["segments"]
+    assert len(first["segments"]) == first["total_options"]
+
+
+def test_custom_lists_are_paged_with_a_cursor(client):
+    ids = [client.post("/api/custom-lists", params={"name": f"paging test {n}"}, json=["Pizza", "Sushi"]).json()["id"]
+           for n in range(5)]
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        page = client.get("/api/custom-lists", params=params).json()
+        seen += [custom_list["id"] for custom_list in page["lists"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert [list_id for list_id in seen if list_id in ids] == ids
+    assert len(seen) == len(set(seen))
+    assert client.get("/api/custom-lists", params={"cursor": "!!!"}).status_code == 400
+
+
+def test_weighted_spin_never_picks_zero_weight(client):
+    body = {"food_items": ["never", "always"], "weights": [0, 1]}
+    picks = {client.post("/api/spin/weighted", json=body).json()["selected_food"] for _ in range(20)}
+    assert picks == {"always"}
+
+
+def test_stored_list_spins_by_id(client):
+    list_id = client.post("/api/custom-lists", params={"name": "by id"}, json=["Ramen"]).json()["id"]
+    assert client.post(f"/api/spin/{list_id}").json()["selected_food"] == "Ramen"
+    assert client.get(f"/api/custom-lists/{list_id}").json()["items"] == ["Ramen"]
+
+
+def test_import_reports_row_errors(client):
+    rows = [{"name": "import ok", "items": ["Pho"]}, {"name": "import bad"}, "not an object"]
+    report = client.post("/api/custom-lists/import", json=rows).json()
+    assert report["imported"] + report["duplicates"] == 1
+    assert [error["row"] for error in report["errors"]] == [1, 2]
+
+
+def test_import_reports_huge_integer_weights_as_a_row_error(client):
+    body = ('[{"name": "huge weight", "items": ["a", "b"], "weights": [1' + "0" * 400 + ', 1]},'
+            ' {"name": "after huge weight", "items": ["c"]}]')
+    response = client.post("/api/custom-lists/import", content=body)
+    assert response.status_code == 200
+    report = response.json()
+    assert report["imported"] + report["duplicates"] == 1
+    assert [error["row"] for error in report["errors"]] == [0]
+
+
+def test_stats_count_spins(client):
+    before = client.get("/api/stats").json()["total_spins"]
+    client.post("/api/spin", json=["Stats Special"])
+    assert client.get("/api/stats").json()["total_spins"] == before + 1
+
+
+def test_food_search_finds_items_of_new_lists(client):
+    client.post("/api/custom-lists", params={"name": "search"}, json=["Zucchini Quiche"])
+    results = client.get("/api/foods/search", params={"q": "quich"}).json()["results"]
+    assert "Zucchini Quiche" in [result["name"] for result in results]
+
+
+def test_resubmitted_list_maps_onto_the_stored_one(client):
+    first = client.post("/api/custom-lists", params={"name": "dedup"}, json=["Pizza", "Sushi"]).json()
+    again = client.post("/api/custom-lists", params={"name": " dedup"}, json=["Pizza ", "Sushi"]).json()
+    assert again["id"] == first["id"]
+    assert again["created_at"] == first["created_at"]
+
+
+def test_spin_picks_one_of_the_items(client):
+    response = client.post("/api/spin", json=["Pizza", "Sushi"])
+    assert response.status_code == 200
+    assert response.json()["selected_food"] in ("Pizza", "Sushi")
+
+
+def test_spin_session_never_repeats_within_a_round(client):
+    session = client.post("/api/spin-sessions", json={"food_items": ["a", "b", "c"]}).json()
+    path = f"/api/spin-sessions/{session['session_id']}"
+    picks = [client.post(f"{path}/spin").json()["selected_food"] for _ in range(3)]
+    assert sorted(picks) == ["a", "b", "c"]
+    assert client.delete(path).status_code == 200
+    assert client.post(f"{path}/spin").status_code == 404
+
+
+def test_spin_rejects_bad_bodies(client):
+    import server
+
+    assert client.post("/api/spin", json=[]).status_code == 400
+    assert client.post("/api/spin", json={"items": ["a"]}).status_code == 422
+    too_many = ["x"] * (server.item_limits.max_items + 1)
+    assert client.post("/api/spin", json=too_many).status_code == 413
+
+
+def test_change_stream_flag_only_applies_to_mongo():
+    import os
+    import subprocess
+    import sys
+
+    env = {**os.environ, "STORAGE_BACKEND": "memory", "LIST_FEED_CHANGE_STREAM": "true"}
+    script = "import server; print(server.FEED_FROM_CHANGE_STREAM)"
+    output = subprocess.run([sys.executable, "-c", script], env=env, capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))), check=True)
+    assert output.stdout.strip().splitlines()[-1] == "False"
+
+
+def test_storage_breaker_is_exported_and_probe_outlasts_server_selection(client):
+    import server
+
+    assert "storage_circuit_open 0" in client.get("/api/metrics").text
+    assert server.storage_probe.timeout > server.MONGO_TIMEOUT_MS / 1000
+
+
+def _list(n):
+    return {"id": f"feed{n}", "name": f"feed {n}", "items": ["x"], "created_at": f"2024-05-01 00:00:0{n}"}
+
+
+def test_list_feed_sends_lists_both_replayed_and_queued_once(client, monkeypatch):
+    import server
+    from events import Broadcaster
+
+    class Replay:
+        """Two stored lists; the second is created while the replay runs."""
+
+        async def stream(self, after):
+            yield _list(1)
+            feed.publish(_list(2))
+            yield _list(2)
+
+    async def run():
+        subscription = feed.subscribe()
+        events = server._list_events(subscription, ("2024-05-01", ""))
+        sent = [await events.__anext__() for _ in range(2)]
+        feed.publish(_list(3))
+        sent.append(await events.__anext__())
+        await events.aclose()
+        return sent
+
+    feed = Broadcaster()
+    monkeypatch.setattr(server, "custom_lists", Replay())
+    sent = asyncio.run(run())
+    ids = [line for chunk in sent for line in chunk.decode().splitlines() if line.startswith("data:")]
+    assert [json.loads(line[5:])["id"] for line in ids] == ["feed1", "feed2", "feed3"]
+
+
+def test_list_feed_tells_a_lagging_subscriber_to_reconnect(client):
+    import server
+    from events import Broadcaster
+
+    async def run():
+        feed = Broadcaster(max_queue=1)
+        events = server._list_events(feed.subscribe(), None)
+        for n in range(3):
+            feed.publish(_list(n))
+        return [chunk async for chunk in events]
+
+    assert asyncio.run(run())[-1] == b"event: lagged\ndata: {}\n\n"
+
+
+def test_list_feed_refuses_subscribers_past_the_cap(client, monkeypatch):
+    import server
+    from events import Broadcaster
+
+    monkeypatch.setattr(server, "list_feed", Broadcaster(max_subscribers=0))
+    assert client.get("/api/custom-lists/events").status_code == 503
@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from sessions import SessionStore, ShuffleBag
+
+
+@pytest.mark.parametrize("n", [1, 2, 7, 300])
+def test_each_round_draws_every_index_once(n):
+    bag = ShuffleBag(n)
+    rng = random.Random(n)
+    for _ in range(3):
+        assert sorted(bag.draw_many(n, rng)) == list(range(n))
+
+
+@pytest.mark.parametrize("seed", range(20))
+def test_no_repeat_across_refills(seed):
+    bag = ShuffleBag(3)
+    draws = bag.draw_many(30, random.Random(seed))
+    assert all(a != b for a, b in zip(draws, draws[1:]))
+
+
+def test_index_array_uses_the_smallest_type():
+    assert ShuffleBag(256).order.typecode == "B"
+    assert ShuffleBag(257).order.typecode == "H"
+
+
+def test_empty_bag_is_rejected():
+    with pytest.raises(ValueError):
+        ShuffleBag(0)
+
+
+def test_sessions_expire_when_idle():
+    store = SessionStore(idle_ttl=60)
+    session_id, session = store.create(["a", "b"])
+    assert store.get(session_id) is session
+    session.touched -= 61
+    assert store.get(session_id) is None
+    assert store.stats()["expired"] == 1
+
+
+def test_expire_only_drops_idle_sessions_and_respects_limit():
+    store = SessionStore(idle_ttl=60)
+    ids = [store.create(["a"])[0] for _ in range(5)]
+    for session_id in ids[:3]:
+        store._sessions[session_id].touched -= 120
+    assert store.expire(limit=2) == 2
+    assert store.expire() == 1
+    assert len(store) == 2
+
+
+def test_store_evicts_least_recently_used():
+    store = SessionStore(maxsize=2)
+    first, _ = store.create(["a"])
+    second, _ = store.create(["a"])
+    store.get(first)
+    store.create(["a"])
+    assert store.get(second) is None
+    assert store.get(first) is not None
+    assert store.stats()["evicted"] == 1
+
+
+def test_discard():
+    store = SessionStore()
+    session_id, _ = store.create(["a"])
+    assert store.discard(session_id)
+    assert not store.discard(session_id)
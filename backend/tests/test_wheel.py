@@ -0,0 +1,38 @@
+import random
+
+from wheel import POINTER_ANGLE, STOP_SPREAD, WheelLayout, WheelLayoutCache, stop_angle
+
+THEME = {"id": "classic", "colors": ["#111111", "#222222"]}
+
+
+def test_stop_angle_lands_inside_the_segment():
+    rng = random.Random(7)
+    n = 12
+    width = 360 / n
+    for index in range(n):
+        for _ in range(50):
+            # Segment centre measured from the pointer after the rotation
+            offset = (POINTER_ANGLE - stop_angle(index, n, rng) - (index + 0.5) * width) % 360
+            assert min(offset, 360 - offset) <= STOP_SPREAD * width + 0.01
+
+
+def test_layout_stop_angle_matches_item_count_version():
+    layout = WheelLayout(["a", "b", "c"], THEME["colors"])
+    assert layout.stop_angle(1, random.Random(3)) == stop_angle(1, 3, random.Random(3))
+
+
+def test_cache_reuses_layouts():
+    cache = WheelLayoutCache()
+    first = cache.get("k", THEME, ["a", "b"])
+    assert cache.get("k", THEME, ["a", "b"]) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_cache_is_bounded_by_total_segments():
+    cache = WheelLayoutCache(maxsize=100, max_segments=25)
+    for n in range(5):
+        cache.get(n, THEME, [str(i) for i in range(10)])
+    assert len(cache) == 2
+    assert cache.segments == 20
+    cache.get("big", THEME, [str(i) for i in range(30)])
+    assert len(cache) == 0 and cache.segments == 0
@@ -0,0 +1,174 @@
+"""Precomputed wheel geometry and SVG, matching frontend/src/components/SpinningWheel.js."""
+import hashlib
+import json
+import math
+import random
+from collections import OrderedDict
+from typing import Hashable, Optional, Sequence
+from xml.sax.saxutils import escape
+
+RADIUS = 150
+INNER_RADIUS = 30
+SIZE = 320
+# The pointer sits at the top of the wheel; SVG angles run clockwise from +x.
+POINTER_ANGLE = 270.0
+# Where in its segment the wheel may stop, as a fraction of the segment
+# either side of the middle, so it never stops on a border.
+STOP_SPREAD = 0.4
+
+
+def items_key(items: Sequence[str]) -> str:
+    """Content hash of an item list, for caching ad-hoc wheels."""
+    return hashlib.blake2b(json.dumps(list(items), ensure_ascii=False).encode(), digest_size=16).hexdigest()
+
+
+def stop_angle(index: int, n: int, rng: random.Random = random) -> float:
+    """Rotation (degrees, 0-360, clockwise) leaving segment ``index`` of ``n`` under the pointer.
+
+    Spin the wheel by whole turns plus whatever brings its rotation modulo
+    360 to this angle. Needs only the segment count, not a layout.
+    """
+    angle = 360 / n
+    target = (index + 0.5) * angle + rng.uniform(-STOP_SPREAD, STOP_SPREAD) * angle
+    return round((POINTER_ANGLE - target) % 360, 2)
+
+
+def _num(x: float) -> str:
+    text = f"{x:.2f}".rstrip("0").rstrip(".")
+    return "0" if text == "-0" else text
+
+
+def _label(item: str) -> str:
+    return f"{item[:12]}..." if len(item) > 15 else item
+
+
+def _segment_path(start: float, end: float) -> str:
+    if end - start >= 360:
+        # A single segment is a full ring; an arc cannot start and end on
+        # the same point, so draw each circle as two halves.
+        r, ir = _num(RADIUS), _num(INNER_RADIUS)
+        return (f"M {r} 0 A {r} {r} 0 1 1 -{r} 0 A {r} {r} 0 1 1 {r} 0 "
+                f"M {ir} 0 A {ir} {ir} 0 1 0 -{ir} 0 A {ir} {ir} 0 1 0 {ir} 0 Z")
+    a, b = math.radians(start), math.radians(end)
+    large_arc = 1 if end - start > 180 else 0
+    x1, y1 = _num(math.cos(a) * RADIUS), _num(math.sin(a) * RADIUS)
+    x2, y2 = _num(math.cos(b) * RADIUS), _num(math.sin(b) * RADIUS)
+    x3, y3 = _num(math.cos(b) * INNER_RADIUS), _num(math.sin(b) * INNER_RADIUS)
+    x4, y4 = _num(math.cos(a) * INNER_RADIUS), _num(math.sin(a) * INNER_RADIUS)
+    return (f"M {x4} {y4} L {x1} {y1} A {RADIUS} {RADIUS} 0 {large_arc} 1 {x2} {y2} "
+            f"L {x3} {y3} A {INNER_RADIUS} {INNER_RADIUS} 0 {large_arc} 0 {x4} {y4} Z")
+
+
+class WheelLayout:
+    """Segment paths, colours and label positions for one wheel and theme.
+
+    The JSON and SVG encodings are built on first use and kept, so serving a
+    cached layout again is a byte copy.
+    """
+
+    __slots__ = ("segments", "_json", "_svg", "_svg_json")
+
+    def __init__(self, items: Sequence[str], colors: Sequence[str]):
+        n = len(items)
+        angle = 360 / n
+        text_radius = (RADIUS + INNER_RADIUS) / 2
+        segments = []
+        for index, item in enumerate(items):
+            start, end = index * angle, (index + 1) * angle
+            middle = math.radians((start + end) / 2)
+            segments.append({
+                "path": _segment_path(start, end),
+                "color": colors[index % len(colors)],
+                "label": _label(item),
+                "text_x": round(math.cos(middle) * text_radius, 2) + 0.0,  # no -0.0
+                "text_y": round(math.sin(middle) * text_radius, 2) + 0.0,
+                "text_rotation": round((start + end) / 2, 2),
+            })
+        self.segments = segments
+        self._json: Optional[bytes] = None
+        self._svg: Optional[str] = None
+        self._svg_json: Optional[bytes] = None
+
+    def __len__(self) -> int:
+        return len(self.segments)
+
+    def json(self) -> bytes:
+        """The segment list, encoded."""
+        if self._json is None:
+            self._json = json.dumps(self.segments, ensure_ascii=False, separators=(",", ":")).encode()
+        return self._json
+
+    def svg(self) -> str:
+        if self._svg is None:
+            half = SIZE // 2
+            parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{SIZE}" height="{SIZE}" '
+                     f'viewBox="-{half} -{half} {SIZE} {SIZE}">']
+            for segment in self.segments:
+                x, y, rotation = _num(segment["text_x"]), _num(segment["text_y"]), _num(segment["text_rotation"])
+                parts.append(
+                    f'<g><path d="{segment["path"]}" fill="{escape(segment["color"])}" '
+                    f'stroke="white" stroke-width="2" fill-rule="evenodd"/>'
+                    f'<text x="{x}" y="{y}" fill="white" font-size="12" font-weight="bold" '
+                    f'text-anchor="middle" dominant-baseline="central" '
+                    f'transform="rotate({rotation}, {x}, {y})">{escape(segment["label"])}</text></g>'
+                )
+            parts.append("</svg>")
+            self._svg = "".join(parts)
+        return self._svg
+
+    def svg_json(self) -> bytes:
+        """The SVG as an encoded JSON string."""
+        if self._svg_json is None:
+            self._svg_json = json.dumps(self.svg(), ensure_ascii=False).encode()
+        return self._svg_json
+
+    def stop_angle(self, index: int, rng: random.Random = random) -> float:
+        return stop_angle(index, len(self.segments), rng)
+
+
+class WheelLayoutCache:
+    """Bounded LRU of wheel layouts, keyed by (wheel content key, theme id).
+
+    Memory grows with the number of segments (about 1.5 KB each with every
+    encoding built), so besides ``maxsize`` entries the cache holds at most
+    ``max_segments`` segments in total.
+    """
+
+    def __init__(self, maxsize: int = 256, max_segments: int = 20_000):
+        self.maxsize = maxsize
+        self.max_segments = max_segments
+        self.segments = 0
+        self.hits = 0
+        self.misses = 0
+        self._layouts: "OrderedDict[Hashable, WheelLayout]" = OrderedDict()
+
+    def get(self, key: Hashable, theme: dict, items: Sequence[str]) -> WheelLayout:
+        cache_key = (key, theme["id"])
+        layout = self._layouts.get(cache_key)
+        if layout is not None:
+            self._layouts.move_to_end(cache_key)
+            self.hits += 1
+            return layout
+        self.misses += 1
+        layout = WheelLayout(items, theme["colors"])
+        self._layouts[cache_key] = layout
+        self.segments += len(layout)
+        while self._layouts and (len(self._layouts) > self.maxsize or self.segments > self.max_segments):
+            _, evicted = self._layouts.popitem(last=False)
+            self.segments -= len(evicted)
+        return layout
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._layouts),
+            "maxsize": self.maxsize,
+            "segments": self.segments,
+            "max_segments": self.max_segments,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._layouts)